@@ -0,0 +1,78 @@
+"""Decoding HDLC addresses."""
+MAX_ADDRESS_LEN = 4
+INTERN_SIZE = 4096
+
+_INTERNED = {}
+
+
+def decode_address(data, offset=0):
+    """
+    Return address, which starts at offset.
+    The address ends with the byte, which has LSB equal 1. The address may be
+    1, 2 or 4 bytes, if the end is not found, 4 bytes are taken.
+
+    Args:
+        data
+            byte string
+        offset
+            position the address in data
+
+    Returns:
+        (integer address, number of bytes)
+    """
+    value = 0
+    limit = min(offset + MAX_ADDRESS_LEN, len(data))
+    position = offset
+    while position < limit:
+        octet = ord(data[position])
+        value = value << 8 | octet
+        position += 1
+        if octet & 0x1:
+            break
+    return value, position - offset
+
+
+def split_address(value, size):
+    """
+    Return (upper, lower) HDLC address of the integer address.
+    The lower address is None for 1 byte address.
+    """
+    if size == 1:
+        return value >> 1, None
+    if size == 2:
+        return (value >> 9) & 0x7f, (value >> 1) & 0x7f
+    if size == 4:
+        upper = ((value >> 25) & 0x7f) << 7 | ((value >> 17) & 0x7f)
+        lower = ((value >> 9) & 0x7f) << 7 | ((value >> 1) & 0x7f)
+        return upper, lower
+    raise ValueError("wrong address length {}".format(size))
+
+
+def encode_address(upper, lower=None):
+    """
+    Return bytes of HDLC address, inverse to split_address.
+    1 byte address is used without lower address, 2 bytes address, if both
+    addresses are less than 128, otherwise 4 bytes address.
+    """
+    if lower is None:
+        octets = [upper]
+    elif upper < 0x80 and lower < 0x80:
+        octets = [upper, lower]
+    else:
+        octets = [upper >> 7, upper & 0x7f, lower >> 7, lower & 0x7f]
+    data = [chr((octet << 1) & 0xfe) for octet in octets]
+    data[-1] = chr(ord(data[-1]) | 0x1)
+    return ''.join(data)
+
+
+def intern_address(octets):
+    """
+    Return address in hex. The same string object is returned for the same
+    address, until INTERN_SIZE addresses are interned.
+    """
+    value = _INTERNED.get(octets)
+    if value is None:
+        value = octets.encode('hex')
+        if len(_INTERNED) < INTERN_SIZE:
+            _INTERNED[octets] = value
+    return value
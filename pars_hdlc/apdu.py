@@ -0,0 +1,151 @@
+"""Lazy decoding LLC header and DLMS APDU of the field "information"."""
+
+LLC_REQUEST = 'e6e600'.decode('hex')
+LLC_RESPONSE = 'e6e700'.decode('hex')
+LLC_LEN = 3
+
+# tag: (name, the APDU has "choice" and "invoke-id-and-priority" bytes)
+APDU_TAGS = {
+    0x01: ('initiateRequest', False),
+    0x08: ('initiateResponse', False),
+    0x0e: ('confirmedServiceError', False),
+    0x0f: ('data-notification', False),
+    0x60: ('AARQ', False),
+    0x61: ('AARE', False),
+    0x62: ('RLRQ', False),
+    0x63: ('RLRE', False),
+    0xc0: ('get-request', True),
+    0xc1: ('set-request', True),
+    0xc2: ('event-notification-request', False),
+    0xc3: ('action-request', True),
+    0xc4: ('get-response', True),
+    0xc5: ('set-response', True),
+    0xc7: ('action-response', True),
+    0xc8: ('glo-get-request', False),
+    0xc9: ('glo-set-request', False),
+    0xcb: ('glo-action-request', False),
+    0xcc: ('glo-get-response', False),
+    0xcd: ('glo-set-response', False),
+    0xcf: ('glo-action-response', False),
+    0xd8: ('exception-response', False),
+    0xdb: ('general-glo-ciphering', False),
+    0xe0: ('general-block-transfer', False),
+}
+
+UNKNOWN_APDU = ('unknown', False)
+
+
+class Apdu(object):
+    """
+    APDU inside the field "information".
+    Keep only the frame bytes and offsets, the fields are decoded on access.
+    """
+    __slots__ = ('_data', '_start', '_end')
+
+    def __init__(self, data, start, end):
+        """Initialization fields"""
+        self._data = data
+        self._start = start
+        self._end = end
+
+    def __len__(self):
+        """Return length APDU without LLC header"""
+        return self._end - self._start - LLC_LEN
+
+    def __repr__(self):
+        """Override magic method __repr__, for print"""
+        return 'Apdu(name={!r}, tag=0x{:02x}, len={})'.format(
+            self.name, self.tag, len(self)
+        )
+
+    @property
+    def llc(self):
+        """Return LLC header as view"""
+        return memoryview(self._data)[self._start:self._start + LLC_LEN]
+
+    @property
+    def is_response(self):
+        """Return True, if LLC header is the response header"""
+        return self._data[self._start:self._start + LLC_LEN] == LLC_RESPONSE
+
+    @property
+    def tag(self):
+        """Return APDU tag"""
+        return ord(self._data[self._start + LLC_LEN])
+
+    @property
+    def name(self):
+        """Return APDU name, defined by the tag"""
+        return APDU_TAGS.get(self.tag, UNKNOWN_APDU)[0]
+
+    @property
+    def choice(self):
+        """
+        Return type the request or response (normal, next, with-list...).
+        None, if the APDU has not the field or it is truncated.
+        """
+        return self._service_byte(1)
+
+    @property
+    def invoke_id_and_priority(self):
+        """
+        Return byte "invoke-id-and-priority".
+        None, if the APDU has not the field or it is truncated.
+        """
+        return self._service_byte(2)
+
+    @property
+    def payload(self):
+        """Return APDU with tag as view, without LLC header"""
+        return memoryview(self._data)[self._start + LLC_LEN:self._end]
+
+    @property
+    def body(self):
+        """Return APDU content after the tag and the service header as view"""
+        header = 1
+        if APDU_TAGS.get(self.tag, UNKNOWN_APDU)[1]:
+            header = 3
+        start = min(self._start + LLC_LEN + header, self._end)
+        return memoryview(self._data)[start:self._end]
+
+    def _service_byte(self, index):
+        """Return byte after the tag of the xDLMS service APDU"""
+        if not APDU_TAGS.get(self.tag, UNKNOWN_APDU)[1]:
+            return None
+        position = self._start + LLC_LEN + index
+        if position >= self._end:
+            return None
+        return ord(self._data[position])
+
+
+def decode(data, offset=0, length=None):
+    """
+    Return instance 'Apdu' for bytes of the field "information".
+
+    Args:
+        data
+            byte string or buffer, which contain the field "information"
+        offset
+            position the field "information" in data
+        length
+            length the field "information", by default up to the end of data
+
+    Returns:
+        instance 'Apdu' or None, if there is not LLC header or APDU tag
+    """
+    if length is None:
+        length = len(data) - offset
+    end = offset + length
+    if length <= LLC_LEN or end > len(data):
+        return None
+    # data may be buffer, which has no startswith
+    if data[offset:offset + LLC_LEN] not in (LLC_REQUEST, LLC_RESPONSE):
+        return None
+    return Apdu(data, offset, end)
+
+
+def decode_hex(information):
+    """Return instance 'Apdu' for the field "information" in hex"""
+    if not information:
+        return None
+    return decode(information.decode('hex'))
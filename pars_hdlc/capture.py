@@ -0,0 +1,312 @@
+"""Reading HDLC frames from raw byte captures and streams."""
+import Queue
+import threading
+import zlib
+
+import engines
+import parser
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+FLAG = '\x7e'
+FORMAT_TYPE = 0xa0
+MIN_FRAME_LEN = 7
+CHUNK_SIZE = 1 << 20
+QUEUE_SIZE = 8
+
+PARSE_ERRORS = (parser.CheckSummError, parser.LenghtError, ValueError)
+
+
+class Deframer(object):
+    """
+    Split the stream of bytes into frames.
+    The frame is found by the opening flag, the length from the field
+    "frame format" and the closing flag. The closing flag may be the opening
+    flag of the next frame. Bytes between frames are skipped.
+    """
+    def __init__(self):
+        """Initialization fields"""
+        self.tail = ''
+        self.tail_closing = False
+        self.offset = 0
+        self.discarded = 0
+
+    def feed(self, chunk):
+        """
+        Generator, which add chunk to the stream and yield complete frames.
+        The incomplete frame is kept in tail until the next chunk.
+        """
+        data = self.tail + chunk if self.tail else chunk
+        end = len(data)
+        position = 0
+        closing = 0 if self.tail_closing else -1
+        find = data.find
+        while True:
+            start = find(FLAG, position)
+            if start < 0:
+                self.discarded += end - position
+                position = end
+                break
+            self.discarded += start - position
+            position = start
+            if start + 3 > end:
+                break
+            high = ord(data[start + 1])
+            frame_len = (high & 0x07) << 8 | ord(data[start + 2])
+            stop = start + frame_len + 2
+            if high & 0xf0 != FORMAT_TYPE or frame_len < MIN_FRAME_LEN:
+                if start != closing:
+                    self.discarded += 1
+                position = start + 1
+                continue
+            if stop > end:
+                break
+            if data[stop - 1] != FLAG:
+                self.discarded += 1
+                position = start + 1
+                continue
+            yield data[start:stop]
+            closing = position = stop - 1
+        self.offset += position
+        self.tail = data[position:]
+        self.tail_closing = position == closing
+
+    @property
+    def consumed(self):
+        """Return number of bytes fed to the deframer"""
+        return self.offset + len(self.tail)
+
+    def state(self):
+        """Return the state as dictionary of JSON types, tail is in hex"""
+        return {
+            'tail': self.tail.encode('hex'),
+            'tail_closing': self.tail_closing,
+            'offset': self.offset,
+            'discarded': self.discarded,
+        }
+
+    def restore(self, state):
+        """Set the state returned by method state"""
+        self.tail = str(state['tail']).decode('hex')
+        self.tail_closing = state['tail_closing']
+        self.offset = state['offset']
+        self.discarded = state['discarded']
+
+
+def _gzip_decompressor():
+    """Return decompressor for one gzip member"""
+    return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+
+def _xz_decompressor():
+    """Return decompressor for one xz stream"""
+    if lzma is None:
+        raise ImportError("lzma or backports.lzma is required for xz files")
+    return lzma.LZMADecompressor()
+
+
+DECOMPRESSORS = {
+    '.gz': _gzip_decompressor,
+    '.xz': _xz_decompressor,
+}
+
+
+def _inflate(fileobj, new_decompressor, chunk_size):
+    """
+    Generator, which decompress file object by chunks.
+    Concatenated members (streams) are decompressed one after another.
+    """
+    decompressor = new_decompressor()
+    started = False
+    while True:
+        data = fileobj.read(chunk_size)
+        if not data:
+            if started and not _finished(decompressor):
+                raise EOFError("compressed capture is truncated")
+            return
+        started = True
+        while data:
+            if getattr(decompressor, 'eof', False):
+                decompressor = new_decompressor()
+            chunk = decompressor.decompress(data)
+            if chunk:
+                yield chunk
+            data = decompressor.unused_data
+            if data:
+                decompressor = new_decompressor()
+
+
+def _finished(decompressor):
+    """
+    Check, that the decompressor reached the end of the member (stream).
+    zlib of Python 2 has not attribute "eof": the ended stream does not
+    consume more data and keeps it in unused_data.
+    """
+    eof = getattr(decompressor, 'eof', None)
+    if eof is not None:
+        return eof
+    try:
+        decompressor.decompress('\x00')
+    except zlib.error:
+        return False
+    return bool(decompressor.unused_data)
+
+
+class _DecompressWorker(threading.Thread):
+    """
+    Thread, which decompress the capture and put chunks into queue,
+    so decompression overlaps with parsing.
+    """
+    def __init__(self, chunks, queue_size):
+        """Initialization fields"""
+        threading.Thread.__init__(self, name='pars_hdlc-decompress')
+        self.daemon = True
+        self.queue = Queue.Queue(queue_size)
+        self.stopped = threading.Event()
+        self._chunks = chunks
+
+    def run(self):
+        """Put decompressed chunks, exception or None at the end"""
+        try:
+            for chunk in self._chunks:
+                if not self._put(chunk):
+                    return
+        except Exception as error:  # pylint: disable=broad-except
+            self._put(error)
+            return
+        self._put(None)
+
+    def _put(self, item):
+        """Put item into queue, return False, if the reader is stopped"""
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except Queue.Full:
+                continue
+        return False
+
+
+def _read_compressed(fileobj, new_decompressor, chunk_size, queue_size):
+    """Generator the chunks, decompressed in separate thread"""
+    worker = _DecompressWorker(
+        _inflate(fileobj, new_decompressor, chunk_size), queue_size
+    )
+    worker.start()
+    try:
+        while True:
+            item = worker.queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        worker.stopped.set()
+
+
+def _read_plain(fileobj, chunk_size):
+    """Generator the chunks of not compressed file object"""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_chunks(source, chunk_size=CHUNK_SIZE, queue_size=QUEUE_SIZE,
+                compression=None):
+    """
+    Generator the decompressed chunks of the capture.
+
+    Args:
+        source
+            path to the capture or file object opened in binary mode
+        chunk_size
+            size of the chunk read from the source
+        queue_size
+            number of decompressed chunks, which are read ahead
+        compression
+            '.gz', '.xz' or None. By default it is defined by the extension
+            of the path
+
+    Returns:
+        generator of byte strings
+    """
+    close = False
+    if isinstance(source, basestring):
+        if compression is None:
+            compression = next(
+                (ext for ext in DECOMPRESSORS if source.endswith(ext)), None
+            )
+        fileobj = open(source, 'rb')
+        close = True
+    else:
+        fileobj = source
+    try:
+        if compression is None:
+            chunks = _read_plain(fileobj, chunk_size)
+        else:
+            chunks = _read_compressed(
+                fileobj, DECOMPRESSORS[compression], chunk_size, queue_size
+            )
+        for chunk in chunks:
+            yield chunk
+    finally:
+        if close:
+            fileobj.close()
+
+
+def read_frames(source, deframer=None, **kwargs):
+    """
+    Generator the frames (in bytes) of the capture.
+    Keyword arguments are passed to read_chunks.
+    """
+    if deframer is None:
+        deframer = Deframer()
+    for chunk in read_chunks(source, **kwargs):
+        for frame in deframer.feed(chunk):
+            yield frame
+
+
+def parse_frame(get_payload, frame, on_error=None):
+    """
+    Return instance 'Message' of the frame or None, if the frame is not
+    parsed and on_error(frame, exception) is called for it. By default the
+    exception is raised.
+    """
+    try:
+        return get_payload(frame)
+    except PARSE_ERRORS as error:
+        if on_error is None:
+            raise
+        on_error(frame, error)
+        return None
+
+
+def iter_messages(frames, pars=None, on_error=None):
+    """
+    Generator the instances 'Message' of the frames.
+
+    Args:
+        frames
+            iterable of frames in bytes
+        pars
+            instance 'Parser', by default engines.create_parser()
+        on_error
+            function on_error(frame, exception) called for the frame, which
+            is not parsed. By default the exception is raised.
+    """
+    if pars is None:
+        pars = engines.create_parser()
+    get_payload = pars.get_payload_bytes
+    for frame in frames:
+        message = parse_frame(get_payload, frame, on_error)
+        if message is not None:
+            yield message
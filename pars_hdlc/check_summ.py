@@ -1,3 +1,5 @@
+import struct
+
 CS_TABLE = [
     0x0000, 0x1189, 0x2312, 0x329b, 0x4624, 0x57ad, 0x6536, 0x74bf,
     0x8c48, 0x9dc1, 0xaf5a, 0xbed3, 0xca6c, 0xdbe5, 0xe97e, 0xf8f7,
@@ -53,3 +55,109 @@ def checksum(octets):
         value = (value >> 8) ^ fcs_table[(value ^ ord(octet)) & 0xFF]
 
     return value ^ 0xFFFF
+
+
+_WORD_TABLE = []
+
+
+def _word_table():
+    """
+    Return table for processing two octets per step: entry for the register
+    value xor the word (first octet in low byte)
+    """
+    if not _WORD_TABLE:
+        fcs_table = CS_TABLE
+        _WORD_TABLE.extend(
+            (fcs_table[word & 0xFF] >> 8) ^
+            fcs_table[((word >> 8) ^ fcs_table[word & 0xFF]) & 0xFF]
+            for word in xrange(0x10000)
+        )
+    return _WORD_TABLE
+
+
+def checksum_words(octets):
+    """
+    Compute the same checksum as checksum, processing two octets per step
+    with the table of 65536 entries
+    """
+    word_table = _word_table()
+    count = len(octets) // 2
+    value = 0xFFFF
+    for word in struct.unpack('<{}H'.format(count), octets[:count * 2]):
+        value = word_table[value ^ word]
+    if len(octets) % 2:
+        value = (value >> 8) ^ CS_TABLE[(value ^ ord(octets[-1])) & 0xFF]
+
+    return value ^ 0xFFFF
+
+
+def _matrix_times(matrix, vector):
+    """Multiply matrix over GF(2) (list of columns) by vector"""
+    result = 0
+    column = 0
+    while vector:
+        if vector & 1:
+            result ^= matrix[column]
+        vector >>= 1
+        column += 1
+    return result
+
+
+def _matrix_square(matrix):
+    """Return square of the matrix over GF(2)"""
+    return [_matrix_times(matrix, column) for column in matrix]
+
+
+def _zero_operators(count):
+    """
+    Return list of matrices, which apply 2**n zero octets to the register
+    of the checksum, n is the index
+    """
+    # one zero bit: shift right, xor the reflected polynomial 0x8408
+    operator = [0x8408] + [1 << bit for bit in range(15)]
+    for _ in range(3):
+        operator = _matrix_square(operator)
+    operators = [operator]
+    for _ in range(count - 1):
+        operators.append(_matrix_square(operators[-1]))
+    return operators
+
+
+ZERO_OPERATORS = _zero_operators(64)
+
+
+def combine(crc_a, crc_b, len_b):
+    """
+    Return checksum of the concatenation A + B from checksum of A, checksum
+    of B and length of B in octets, the same as zlib.crc32_combine.
+    The checksum of A is moved over len_b zero octets by the precomputed
+    powers of the shift matrix, so the time is O(log(len_b)).
+
+    The checksum is extended over appended data without the prefix:
+    combine(checksum(prefix), checksum(appended), len(appended))
+    """
+    if len_b < 0:
+        raise ValueError("negative length {}".format(len_b))
+    level = 0
+    while len_b:
+        if len_b & 1:
+            crc_a = _matrix_times(ZERO_OPERATORS[level], crc_a)
+        len_b >>= 1
+        level += 1
+    return crc_a ^ crc_b
+
+
+def checksum_chunks(data, chunk_size=1 << 20, map_function=map):
+    """
+    Compute the same checksum as checksum, the chunks of data are computed
+    independently by map_function (for example multiprocessing.Pool().map)
+    and combined
+    """
+    chunks = [
+        data[start:start + chunk_size]
+        for start in xrange(0, len(data), chunk_size)
+    ]
+    value = checksum('')
+    for chunk, chunk_value in zip(chunks, map_function(checksum, chunks)):
+        value = combine(value, chunk_value, len(chunk))
+    return value
@@ -0,0 +1,199 @@
+"""Checkpointed processing of long captures, which resumes after restart."""
+import errno
+import json
+import os
+import tempfile
+import time
+
+import capture
+import engines
+import serializers
+
+INTERVAL = 10.0
+VERSION = 1
+
+
+def save(path, state):
+    """
+    Write the state to JSON file atomically: the temporary file in the same
+    directory is synced to disk and renamed over the previous checkpoint
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(
+        dir=directory, prefix='.checkpoint-', suffix='.tmp'
+    )
+    try:
+        with os.fdopen(handle, 'w') as fileobj:
+            json.dump(state, fileobj, sort_keys=True)
+            fileobj.flush()
+            os.fsync(fileobj.fileno())
+        os.rename(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+    _sync_directory(directory)
+
+
+def load(path):
+    """Return the state saved in the file or None, if there is no file"""
+    try:
+        with open(path) as fileobj:
+            state = json.load(fileobj)
+    except IOError as error:
+        if error.errno == errno.ENOENT:
+            return None
+        raise
+    if state.get('version') != VERSION:
+        raise ValueError("unsupported checkpoint version {!r}".format(
+            state.get('version')
+        ))
+    return state
+
+
+def _sync_directory(directory):
+    """Sync the directory, so the rename is on disk"""
+    try:
+        handle = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(handle)
+    except OSError:
+        pass
+    finally:
+        os.close(handle)
+
+
+class CheckpointedJob(object):
+    """
+    Processing of the captures, which is resumed from the checkpoint file.
+
+    The checkpoint keeps the number of finished captures, the state of the
+    deframer (offset of the last processed frame and the incomplete tail),
+    the counters and the size of the output. It is saved at the chunk
+    boundary after all frames of the chunk are counted and the output is
+    synced, not more often than every "interval" seconds. On resume the
+    output is truncated to the saved size and the capture is read from the
+    saved position, so every frame is parsed and written once.
+
+    Args:
+        sources
+            list of paths to the captures
+        checkpoint_path
+            path to the checkpoint file
+        counters
+            object with methods add(message), add_error(frame, error),
+            state() and restore(state), for example stats.TrafficStats
+        output
+            path to the file of the parsed messages or None
+        writer_class
+            class from serializers, which writes the output
+        interval
+            minimal interval between checkpoints in seconds
+        chunk_size
+            size of the chunk read from the capture
+    """
+    def __init__(self, sources, checkpoint_path, counters, output=None,
+                 writer_class=serializers.JsonLinesWriter, interval=INTERVAL,
+                 chunk_size=capture.CHUNK_SIZE):
+        """Initialization fields"""
+        self.sources = list(sources)
+        self.checkpoint_path = checkpoint_path
+        self.counters = counters
+        self.output = output
+        self.writer_class = writer_class
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.checkpoints = 0
+
+    def run(self, pars=None):
+        """Process the captures from the checkpoint, return the counters"""
+        if pars is None:
+            pars = engines.create_parser()
+        state = load(self.checkpoint_path)
+        if state is None:
+            state = {'index': 0, 'deframer': None, 'output_size': 0}
+        else:
+            if state['sources'] != self.sources:
+                raise ValueError("checkpoint is saved for other captures")
+            self.counters.restore(state['counters'])
+        fileobj = None
+        write = None
+        if self.output is not None:
+            fileobj = self._open_output(state['output_size'])
+            write = self._create_writer(fileobj, state['output_size']).write
+        try:
+            self._process(state, pars, fileobj, write)
+        finally:
+            if fileobj is not None:
+                fileobj.close()
+        return self.counters
+
+    def _process(self, state, pars, fileobj, write):
+        """Process the captures starting from the state"""
+        add = self.counters.add
+        add_error = self.counters.add_error
+        deadline = time.time() + self.interval
+        for index in range(state['index'], len(self.sources)):
+            deframer = capture.Deframer()
+            if index == state['index'] and state['deframer'] is not None:
+                deframer.restore(state['deframer'])
+            for chunk in self._read(self.sources[index], deframer.consumed):
+                for message in capture.iter_messages(
+                        deframer.feed(chunk), pars, on_error=add_error):
+                    add(message)
+                    if write is not None:
+                        write(message)
+                if time.time() >= deadline:
+                    self._save(index, deframer, fileobj)
+                    deadline = time.time() + self.interval
+            self._save(index + 1, None, fileobj)
+
+    def _read(self, source, position):
+        """Generator the chunks of the capture starting at position"""
+        compressed = any(source.endswith(ext) for ext in capture.DECOMPRESSORS)
+        if not compressed:
+            with open(source, 'rb') as fileobj:
+                fileobj.seek(position)
+                for chunk in capture.read_chunks(fileobj, self.chunk_size):
+                    yield chunk
+            return
+        # compressed stream is not seekable, skipped bytes are not parsed
+        for chunk in capture.read_chunks(source, self.chunk_size):
+            if position >= len(chunk):
+                position -= len(chunk)
+                continue
+            yield chunk[position:]
+            position = 0
+
+    def _save(self, index, deframer, fileobj):
+        """Sync the output and save the checkpoint"""
+        output_size = 0
+        if fileobj is not None:
+            fileobj.flush()
+            os.fsync(fileobj.fileno())
+            output_size = fileobj.tell()
+        save(self.checkpoint_path, {
+            'version': VERSION,
+            'sources': self.sources,
+            'index': index,
+            'deframer': deframer.state() if deframer is not None else None,
+            'counters': self.counters.state(),
+            'output_size': output_size,
+        })
+        self.checkpoints += 1
+
+    def _open_output(self, size):
+        """Open the output, drop the data written after the checkpoint"""
+        handle = os.open(self.output, os.O_RDWR | os.O_CREAT)
+        fileobj = os.fdopen(handle, 'r+b')
+        fileobj.truncate(size)
+        fileobj.seek(size)
+        return fileobj
+
+    def _create_writer(self, fileobj, size):
+        """Return writer, CSV header is written only to the empty output"""
+        if issubclass(self.writer_class, serializers.CsvWriter):
+            return self.writer_class(fileobj, header=not size)
+        return self.writer_class(fileobj)
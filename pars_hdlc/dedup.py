@@ -0,0 +1,109 @@
+"""Detecting duplicated and retransmitted HDLC frames."""
+import collections
+import time
+
+WINDOW = 65536
+# seconds, longer than the retransmission timeout, shorter than the period,
+# in which the client repeats byte-identical poll (N(S) and N(R) wrap after
+# 8 frames)
+MAX_AGE = 2.0
+
+
+def fingerprint(message):
+    """
+    Return fingerprint the frame: addresses, frame length and FCS.
+    Return None for frames without the field "information", they have not FCS
+    and the same frame (for example RR) is repeated legally.
+    """
+    if message.fcs is None:
+        return None
+    return (
+        message.dest_addr,
+        message.scr_addr,
+        message.frame_format.frame_len,
+        message.fcs,
+    )
+
+
+class Deduplicator(object):
+    """
+    Set of fingerprints the last frames.
+    The set keeps not more than "window" fingerprints and, if "max_age" is
+    not None, only fingerprints not older than "max_age" seconds.
+    The window bounded only by count (max_age=None) drops legal periodic
+    frames: the same poll on the quiet link is byte-identical every 8 polls.
+    """
+    def __init__(self, window=WINDOW, max_age=MAX_AGE):
+        """Initialization fields"""
+        self.window = window
+        self.max_age = max_age
+        self.duplicates = 0
+        self._order = collections.deque()
+        self._seen = {}
+
+    def __len__(self):
+        """Return number of fingerprints in the window"""
+        return len(self._order)
+
+    def is_duplicate(self, message, now=None):
+        """
+        Check, that the frame was seen in the window and add it to the window.
+
+        Args:
+            message
+                instance 'Message' with validated FCS
+            now
+                time of the frame, by default the current time, used only
+                with max_age
+
+        Returns:
+            True, if the frame is repeat
+        """
+        key = fingerprint(message)
+        if key is None:
+            return False
+        if self.max_age is not None and now is None:
+            now = time.time()
+        self._expire(now)
+        duplicate = key in self._seen
+        if duplicate:
+            self.duplicates += 1
+            self._seen[key] += 1
+        else:
+            self._seen[key] = 1
+        self._order.append((key, now))
+        return duplicate
+
+    def filter(self, messages, drop=True):
+        """
+        Generator, which drops repeated messages.
+        If drop is False, yield pairs (message, is duplicate).
+        """
+        is_duplicate = self.is_duplicate
+        for message in messages:
+            duplicate = is_duplicate(message)
+            if not drop:
+                yield message, duplicate
+            elif not duplicate:
+                yield message
+
+    def clear(self):
+        """Remove all fingerprints"""
+        self._order.clear()
+        self._seen.clear()
+
+    def _expire(self, now):
+        """Remove fingerprints out of the window"""
+        order = self._order
+        seen = self._seen
+        deadline = None
+        if self.max_age is not None:
+            deadline = now - self.max_age
+        while order and (len(order) >= self.window or
+                         (deadline is not None and order[0][1] < deadline)):
+            key = order.popleft()[0]
+            count = seen[key] - 1
+            if count:
+                seen[key] = count
+            else:
+                del seen[key]
@@ -0,0 +1,177 @@
+"""
+Registry of parser engines.
+
+The engine is the checksum function and the parser class. At first use the
+registered engines are checked against the reference engine and timed, the
+fastest correct engine is chosen and its name is cached per host, the engine
+may be forced by the environment variable PARS_HDLC_ENGINE.
+"""
+import collections
+import json
+import os
+import random
+import socket
+import tempfile
+import timeit
+
+import check_summ
+import parser
+
+ENGINE_VARIABLE = 'PARS_HDLC_ENGINE'
+CACHE_VARIABLE = 'PARS_HDLC_ENGINE_CACHE'
+REFERENCE = 'python'
+CHECK_PAYLOADS = 200
+CHECK_SEED = 0x7e
+CALIBRATION_FRAMES = (
+    "7ea011610330d3bee6e700c70181010052ab7e",
+    "7ea00703413142e27e",
+    "7ea0200361931b9f8180140502080006020800070400000007080400000007b3c67e",
+    "7ea0586103300751e6e700614aa109060760857405080101a2030201"
+    "00a305a10302010e88020780890760857405080202aa1280106162636"
+    "465666768696a6b6c6d6e6f70be10040e0800065f1f040000181d0164000718d07e",
+)
+
+Engine = collections.namedtuple('Engine', ['name', 'checksum', 'parser_class'])
+
+_ENGINES = collections.OrderedDict()
+_SELECTED = []
+
+
+class EngineError(Exception):
+    """Raised, if the engine is not registered"""
+    pass
+
+
+def register(name, checksum, parser_class=parser.Parser):
+    """Add the engine to the registry and return it"""
+    engine = Engine(name, checksum, parser_class)
+    _ENGINES[name] = engine
+    return engine
+
+
+def engines():
+    """Return list of the registered engines"""
+    return list(_ENGINES.values())
+
+
+def get(name):
+    """Return the registered engine by name"""
+    try:
+        return _ENGINES[name]
+    except KeyError:
+        raise EngineError("unknown engine {!r}".format(name))
+
+
+def self_check(engine, count=CHECK_PAYLOADS):
+    """
+    Compare the engine with the reference on the random payloads and on the
+    calibration frames, return True, if all results are the same
+    """
+    reference = _ENGINES[REFERENCE]
+    generator = random.Random(CHECK_SEED)
+    for size in range(count):
+        payload = ''.join(chr(generator.randrange(256)) for _ in range(size))
+        if engine.checksum(payload) != reference.checksum(payload):
+            return False
+        if engine.checksum(buffer(payload, 1)) != \
+                reference.checksum(buffer(payload, 1)):
+            return False
+    for frame in CALIBRATION_FRAMES:
+        if _create(engine).get_payload(frame) != \
+                _create(reference).get_payload(frame):
+            return False
+    return True
+
+
+def calibrate(engine, repeat=3, number=200):
+    """Return the best time of parsing the calibration frames in seconds"""
+    pars = _create(engine)
+    frames = CALIBRATION_FRAMES
+
+    def parse():
+        """Parse all calibration frames"""
+        for frame in frames:
+            pars.get_payload(frame)
+
+    return min(timeit.repeat(parse, repeat=repeat, number=number))
+
+
+def default_cache_path():
+    """Return path to the file with the engine chosen on this host"""
+    path = os.environ.get(CACHE_VARIABLE)
+    if path:
+        return path
+    return os.path.join(
+        os.path.expanduser('~'), '.cache', 'pars_hdlc',
+        'engine-{}.json'.format(socket.gethostname())
+    )
+
+
+def select_engine(cache_path=None, refresh=False):
+    """
+    Return the engine: forced by the environment variable, cached for the
+    host or the fastest engine, which passed the self-check.
+    The cache is ignored, if refresh is True, its engine is not registered
+    or does not pass the self-check again.
+    """
+    forced = os.environ.get(ENGINE_VARIABLE)
+    if forced:
+        return get(forced)
+    if cache_path is None:
+        cache_path = default_cache_path()
+    if not refresh:
+        engine = _ENGINES.get(_read_cache(cache_path))
+        if engine is not None and (
+                engine.name == REFERENCE or self_check(engine)):
+            return engine
+    timings = {}
+    for engine in engines():
+        if engine.name == REFERENCE or self_check(engine):
+            timings[engine.name] = calibrate(engine)
+    name = min(timings, key=timings.get)
+    _write_cache(cache_path, {'engine': name, 'timings': timings})
+    return _ENGINES[name]
+
+
+def get_engine():
+    """Return the engine selected at first call"""
+    if not _SELECTED:
+        _SELECTED.append(select_engine())
+    return _SELECTED[0]
+
+
+def create_parser():
+    """Return new parser of the selected engine"""
+    return _create(get_engine())
+
+
+def _create(engine):
+    """Return new parser of the engine"""
+    return engine.parser_class(checksum=engine.checksum)
+
+
+def _read_cache(path):
+    """Return name of the cached engine or None"""
+    try:
+        with open(path) as cache:
+            return json.load(cache).get('engine')
+    except (IOError, OSError, ValueError, AttributeError):
+        return None
+
+
+def _write_cache(path, data):
+    """Write the cache atomically, the failure does not stop the selection"""
+    directory = os.path.dirname(path) or '.'
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as cache:
+            json.dump(data, cache, sort_keys=True)
+        os.rename(temporary, path)
+    except (IOError, OSError):
+        pass
+
+
+register(REFERENCE, check_summ.checksum)
+register('words', check_summ.checksum_words)
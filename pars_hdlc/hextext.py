@@ -0,0 +1,132 @@
+"""Reading text captures with one frame in hex per line."""
+import array
+import collections
+import itertools
+
+import capture
+
+BLOCK_LINES = 4096
+
+
+class MalformedLineError(ValueError):
+    """Raised, if the line is not the frame in hex"""
+    def __init__(self, line_number, line):
+        """Initialization fields"""
+        super(MalformedLineError, self).__init__(
+            "line {}: malformed hex {!r}".format(line_number, line[:80])
+        )
+        self.line_number = line_number
+        self.line = line
+
+
+class HexBlock(
+        collections.namedtuple('HexBlock', ['data', 'offsets', 'line_numbers'])
+):
+    """
+    Frames of the block of lines decoded to one byte string.
+    The frame "index" is data[offsets[index]:offsets[index + 1]], it is read
+    from the line line_numbers[index].
+    """
+    __slots__ = ()
+
+    def __len__(self):
+        """Return number of frames"""
+        return len(self.line_numbers)
+
+    def frame(self, index):
+        """Return the frame as buffer, the data is not copied"""
+        start = self.offsets[index]
+        return buffer(self.data, start, self.offsets[index + 1] - start)
+
+    def frames(self):
+        """Generator the frames as buffers"""
+        data = self.data
+        offsets = self.offsets
+        for index in xrange(len(self.line_numbers)):
+            start = offsets[index]
+            yield buffer(data, start, offsets[index + 1] - start)
+
+
+def _decode_block(lines, first_line, on_malformed):
+    """
+    Return HexBlock of the lines, the first line has number first_line.
+    Empty lines are skipped, malformed lines are passed to on_malformed.
+    """
+    lines = [line.strip() for line in lines]
+    numbers = xrange(first_line, first_line + len(lines))
+    try:
+        if any(len(line) % 2 for line in lines):
+            raise TypeError("odd-length line")
+        # all lines of the block are decoded in one call
+        data = ''.join(lines).decode('hex')
+    except TypeError:
+        valid = []
+        valid_numbers = []
+        for number, line in itertools.izip(numbers, lines):
+            try:
+                line.decode('hex')
+            except TypeError:
+                on_malformed(number, line)
+                continue
+            valid.append(line)
+            valid_numbers.append(number)
+        lines = valid
+        numbers = valid_numbers
+        data = ''.join(lines).decode('hex')
+    offsets = array.array('L', [0])
+    line_numbers = array.array('L')
+    position = 0
+    for number, line in itertools.izip(numbers, lines):
+        if line:
+            position += len(line) // 2
+            offsets.append(position)
+            line_numbers.append(number)
+    return HexBlock(data, offsets, line_numbers)
+
+
+def _raise_malformed(line_number, line):
+    """Default handler of the malformed line"""
+    raise MalformedLineError(line_number, line)
+
+
+def read_blocks(source, block_lines=BLOCK_LINES, on_malformed=None):
+    """
+    Generator the instances 'HexBlock' of the text capture.
+
+    Args:
+        source
+            path to the text capture or file object
+        block_lines
+            number of lines decoded at once
+        on_malformed
+            function on_malformed(line_number, line) called for the line,
+            which is not in hex, the line is skipped. By default
+            MalformedLineError is raised.
+    """
+    if on_malformed is None:
+        on_malformed = _raise_malformed
+    close = isinstance(source, basestring)
+    fileobj = open(source, 'rb') if close else source
+    try:
+        first_line = 1
+        while True:
+            lines = list(itertools.islice(fileobj, block_lines))
+            if not lines:
+                return
+            yield _decode_block(lines, first_line, on_malformed)
+            first_line += len(lines)
+    finally:
+        if close:
+            fileobj.close()
+
+
+def iter_messages(source, pars=None, on_error=None, on_malformed=None,
+                  block_lines=BLOCK_LINES):
+    """
+    Generator the instances 'Message' of the text capture.
+    Arguments are the same as read_blocks and capture.iter_messages, the
+    frames are parsed from the decoded block without copying.
+    """
+    for block in read_blocks(source, block_lines, on_malformed):
+        for message in capture.iter_messages(block.frames(), pars, on_error):
+            yield message
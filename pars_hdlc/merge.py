@@ -0,0 +1,114 @@
+"""Merging timestamped frames of many captures into one time ordered stream."""
+import collections
+import heapq
+import itertools
+
+import capture
+import engines
+import hextext
+
+READ_AHEAD = 64
+
+
+def read_records(source, on_malformed=None):
+    """
+    Generator (timestamp, frame in bytes) of the text capture with lines
+    "timestamp hex", the timestamp is in seconds (float).
+
+    Args:
+        source
+            path to the text capture or file object
+        on_malformed
+            function on_malformed(line_number, line) called for the line in
+            other format, the line is skipped. By default
+            hextext.MalformedLineError is raised.
+    """
+    close = isinstance(source, basestring)
+    fileobj = open(source, 'rb') if close else source
+    try:
+        for line_number, line in enumerate(fileobj, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                timestamp, frame = line.split(None, 1)
+                record = float(timestamp), frame.strip().decode('hex')
+            except (ValueError, TypeError):
+                if on_malformed is None:
+                    raise hextext.MalformedLineError(line_number, line)
+                on_malformed(line_number, line)
+                continue
+            yield record
+    finally:
+        if close:
+            fileobj.close()
+
+
+class _ReadAhead(object):
+    """Buffer of not more than "size" records read from the source"""
+    def __init__(self, records, size):
+        """Initialization fields"""
+        self._records = iter(records)
+        self._size = size
+        self._buffer = collections.deque()
+
+    def pop(self):
+        """Return the next record or None, if the source is finished"""
+        if not self._buffer:
+            self._buffer.extend(itertools.islice(self._records, self._size))
+            if not self._buffer:
+                return None
+        return self._buffer.popleft()
+
+
+def merge(sources, read_ahead=READ_AHEAD):
+    """
+    Generator (timestamp, index of the source, frame) of all sources in the
+    order of time, the records with the same timestamp are in the order of
+    the sources. Every source must be ordered by time.
+    The heap keeps one record per source and every source reads not more
+    than read_ahead records ahead, so the memory depends only on the number
+    of sources.
+
+    Args:
+        sources
+            list of paths to the text captures (see read_records) or
+            iterables of (timestamp, frame)
+        read_ahead
+            number of records read at once from the source
+    """
+    readers = []
+    heap = []
+    for index, source in enumerate(sources):
+        if isinstance(source, basestring):
+            source = read_records(source)
+        reader = _ReadAhead(source, read_ahead)
+        readers.append(reader)
+        record = reader.pop()
+        if record is not None:
+            heap.append((record[0], index, record[1]))
+    heapq.heapify(heap)
+    while heap:
+        item = heap[0]
+        index = item[1]
+        record = readers[index].pop()
+        if record is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (record[0], index, record[1]))
+        yield item
+
+
+def iter_messages(sources, pars=None, on_error=None, read_ahead=READ_AHEAD):
+    """
+    Generator (timestamp, index of the source, instance 'Message') of the
+    merged sources. Arguments are the same as merge and
+    capture.iter_messages.
+    """
+    if pars is None:
+        pars = engines.create_parser()
+    get_payload = pars.get_payload_bytes
+    for timestamp, index, frame in merge(sources, read_ahead):
+        message = capture.parse_frame(get_payload, frame, on_error)
+        if message is not None:
+            yield timestamp, index, message
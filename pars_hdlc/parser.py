@@ -1,9 +1,26 @@
 
 """HDLC parser."""
 import collections
-import StringIO
+import cStringIO
+import random
+import address
+import apdu
 import check_summ
 
+# Types the command or response, defined by the field "control",
+# empty string is the not defined type
+COMMAND_TYPES = (
+    'I', 'SNRM', 'DISC', 'UA', 'DM', 'FRMR', 'UI', 'RNR', 'RR', '',
+)
+
+# Policies of checking HCS and FCS: both checks of every frame, only HCS,
+# both checks of the frames sampled with the rate
+VERIFY_ALWAYS = 'always'
+VERIFY_HCS = 'hcs'
+VERIFY_SAMPLED = 'sampled'
+VERIFY_POLICIES = (VERIFY_ALWAYS, VERIFY_HCS, VERIFY_SAMPLED)
+MAX_DEFERRED = 65536
+
 
 class Message(
         collections.namedtuple(
@@ -99,16 +116,63 @@ class LenghtError(Exception):
 
 class Parser(object):
     """ HDLC parser"""
-    def __init__(self):
-        """Initialization fields"""
+    def __init__(self, checksum=None, verify=VERIFY_ALWAYS, sample_rate=0.01,
+                 max_deferred=MAX_DEFERRED):
+        """
+        Initialization fields.
+        checksum is the function, which calculate HCS and FCS, by default
+        check_summ.checksum.
+        verify is one of VERIFY_POLICIES, the skipped checks are kept (not
+        more than max_deferred, the oldest are dropped) for verify_deferred.
+        sample_rate is the part of the frames checked by VERIFY_SAMPLED.
+        """
+        if verify not in VERIFY_POLICIES:
+            raise ValueError("unknown verification policy {!r}".format(verify))
+        self.checksum = checksum or check_summ.checksum
+        self.verify = verify
+        self.sample_rate = sample_rate
+        self.deferred = collections.deque(maxlen=max_deferred)
+        self.deferred_dropped = 0
+        self._random = random.Random()
+        self._check_hcs = True
+        self._check_fcs = True
         self.counter_readed_bytes = 0
-        self.raw_frame = None
+        self.frame_bytes = None
+        self.information_offset = None
+        self.information_len = 0
+
+    @property
+    def raw_frame(self):
+        """Return the frame in hex"""
+        if self.frame_bytes is None:
+            return None
+        return str(self.frame_bytes).encode('hex')
+
+    @raw_frame.setter
+    def raw_frame(self, data):
+        """Assign the frame in hex"""
+        self.frame_bytes = None if data is None else data.decode('hex')
 
     def transformation_to_bytes(self, data):
         """Converts to byte string and assign value raw_frame"""
-        file_bytes = StringIO.StringIO(data.decode('hex'))
-        self.raw_frame = data
-        return file_bytes
+        return self._start_frame(data.decode('hex'))
+
+    def _start_frame(self, frame):
+        """
+        Assign the frame in bytes, reset state left from the previous frame.
+        Return the frame as file object.
+        """
+        self.frame_bytes = frame
+        self.counter_readed_bytes = 0
+        self.information_offset = None
+        self.information_len = 0
+        if self.verify == VERIFY_SAMPLED:
+            sampled = self._random.random() < self.sample_rate
+            self._check_hcs = self._check_fcs = sampled
+        else:
+            self._check_hcs = True
+            self._check_fcs = self.verify == VERIFY_ALWAYS
+        return cStringIO.StringIO(frame)
 
     def _get_flag(self, srt_bytes):
         """
@@ -180,18 +244,12 @@ class Parser(object):
         Return value "destination address"  or "source address".
         They may be 1, 2 or 4 bytes.
         """
-        value_end = 0x1
-        bytes_addrr = ''
-        for _ in range(0, 4):
-            bytes_addrr = bytes_addrr + srt_bytes.read(1)
-            number_address = int(bytes_addrr.encode('hex'), 16)
-            self.counter_readed_bytes += 1
-            if number_address & value_end:
-                bytes_addrr = bytes_addrr.encode('hex')
-                break
-            else:
-                continue
-        return bytes_addrr
+        data = self.frame_bytes
+        if data is None:
+            data = srt_bytes.getvalue()
+        _, size = address.decode_address(data, srt_bytes.tell())
+        self.counter_readed_bytes += size
+        return address.intern_address(srt_bytes.read(size))
 
     def _get_lsb(self, value_controll):
         """Return  LSB """
@@ -271,7 +329,7 @@ class Parser(object):
 
     def _validate_checksum(self, expected, value, checksum_type):
         """Check header check sequence."""
-        calculated_checksum = check_summ.checksum(value)
+        calculated_checksum = self.checksum(value)
         if expected != calculated_checksum:
             raise CheckSummError(
                 "{} checksum validation failed. Expected {:}, got {:}".format
@@ -280,13 +338,47 @@ class Parser(object):
                 )
             )
 
+    def _defer_checksum(self, expected, length, checksum_type):
+        """Keep the skipped check of the bytes 1..length of the frame"""
+        frame = self.frame_bytes
+        if not isinstance(frame, str):
+            # the buffer may be reused after parsing
+            frame = frame[:]
+        if len(self.deferred) == self.deferred.maxlen:
+            self.deferred_dropped += 1
+        self.deferred.append((frame, expected, length, checksum_type))
+
+    def verify_deferred(self, limit=None):
+        """
+        Check the skipped checksums in the order of parsing, not more than
+        limit. Return list of (frame in bytes, instance CheckSummError) of
+        the failed checks. It may be called from another thread.
+        """
+        failed = []
+        deferred = self.deferred
+        count = len(deferred) if limit is None else min(limit, len(deferred))
+        for _ in range(count):
+            try:
+                frame, expected, length, checksum_type = deferred.popleft()
+            except IndexError:
+                break
+            try:
+                self._validate_checksum(
+                    expected, buffer(frame, 1, length), checksum_type
+                )
+            except CheckSummError as error:
+                failed.append((frame, error))
+        return failed
+
     def _get_hcs(self, srt_bytes):
         """Return value header check sequence. The field contain 2 bytes"""
         hcs = int(srt_bytes.read(2).encode('hex'), 16)
         hcs = (hcs >> 8 | hcs << 8) & 0xFFFF
-        value = self.raw_frame[2:(self.counter_readed_bytes * 2)]
-        value = value.decode('hex')
-        self._validate_checksum(hcs, value, "HCS")
+        if self._check_hcs:
+            value = buffer(self.frame_bytes, 1, self.counter_readed_bytes - 1)
+            self._validate_checksum(hcs, value, "HCS")
+        else:
+            self._defer_checksum(hcs, self.counter_readed_bytes - 1, "HCS")
         self.counter_readed_bytes += 2
         return hcs
 
@@ -300,15 +392,33 @@ class Parser(object):
         len_info = frame_len - first_flag - self.counter_readed_bytes
         information = srt_bytes.read(len_info)
         information = information.encode('hex')
+        self.information_offset = self.counter_readed_bytes
+        self.information_len = len_info
         self.counter_readed_bytes += len_info
         return information
 
+    def get_apdu(self):
+        """
+        Return the decoded APDU of the last parsed frame.
+        Sub-fields are decoded on access as views into the frame bytes.
+        Return None, if the field "information" is empty or does not start
+        with the LLC header.
+        """
+        if not self.information_len or self.frame_bytes is None:
+            return None
+        return apdu.decode(
+            self.frame_bytes, self.information_offset, self.information_len
+        )
+
     def _get_fcs(self, srt_bytes, frame_format):
         """Return frame check sequence.The field have length 2 bytes."""
         fcs = int(srt_bytes.read(2).encode('hex'), 16)
         fcs = (fcs >> 8 | fcs << 8) & 0xFFFF
-        value = self.raw_frame[2:-6]
-        self._validate_checksum(fcs, value.decode('hex'), "FCS")
+        if self._check_fcs:
+            value = buffer(self.frame_bytes, 1, len(self.frame_bytes) - 4)
+            self._validate_checksum(fcs, value, "FCS")
+        else:
+            self._defer_checksum(fcs, len(self.frame_bytes) - 4, "FCS")
         self.counter_readed_bytes += 2
         self._validation_lenght(frame_format)
         return fcs
@@ -354,10 +464,22 @@ class Parser(object):
         Parsing the string and add the values in the _dict, return
         instance 'Message'
         """
+        srt_bytes = self.transformation_to_bytes(data)
+        return self._parse(srt_bytes)
+
+    def get_payload_bytes(self, frame):
+        """
+        Parsing the frame in bytes (not in hex), return instance 'Message'.
+        The frame may be str or buffer, the buffer is not copied.
+        """
+        srt_bytes = self._start_frame(frame)
+        return self._parse(srt_bytes)
+
+    def _parse(self, srt_bytes):
+        """Parsing the fields of the frame, return instance 'Message'"""
         information = None
         fcs = None
         flag_end = None
-        srt_bytes = self.transformation_to_bytes(data)
         flag = self._get_flag(srt_bytes)
         frame_format = self._get_frame_format(srt_bytes)
         dest_address = self._get_address(srt_bytes)
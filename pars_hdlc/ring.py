@@ -0,0 +1,210 @@
+"""Shared memory ring buffer for passing frames between processes."""
+import mmap
+import os
+import Queue
+import struct
+import time
+
+import capture
+import engines
+
+INDEX = struct.Struct('<Q')
+LENGTH = struct.Struct('<I')
+HEAD_OFFSET = 0
+TAIL_OFFSET = 64
+CLOSED_OFFSET = 128
+DATA_OFFSET = 192
+WRAP = 0xffffffff
+MAX_WAIT = 0.001
+
+
+class RingBuffer(object):
+    """
+    Ring buffer of frames in shared memory (mmap).
+
+    The producer writes the length and the bytes of the frame and then moves
+    "head", the consumer reads the frame and then moves "tail". Each index is
+    written only by one side, so one producer and one consumer work without
+    locks. Several producers must pass the shared "lock" (for example
+    multiprocessing.Lock), use one ring per consumer process.
+    The record must not be bigger than half of the ring, so the record, which
+    does not fit at the end of the ring, always fits after wrapping.
+
+    Anonymous memory is shared with the processes forked after the ring is
+    created, the file given by "path" may be opened in any process.
+    """
+    def __init__(self, size=1 << 22, path=None, create=True, lock=None):
+        """Initialization fields"""
+        self.lock = lock
+        self._fd = None
+        if path is None:
+            self._memory = mmap.mmap(-1, DATA_OFFSET + size)
+        else:
+            flags = os.O_RDWR | (os.O_CREAT if create else 0)
+            self._fd = os.open(path, flags, 0o600)
+            if create:
+                os.ftruncate(self._fd, DATA_OFFSET + size)
+            else:
+                size = os.fstat(self._fd).st_size - DATA_OFFSET
+            self._memory = mmap.mmap(self._fd, DATA_OFFSET + size)
+        self.capacity = size
+        if create:
+            for offset in (HEAD_OFFSET, TAIL_OFFSET, CLOSED_OFFSET):
+                INDEX.pack_into(self._memory, offset, 0)
+        self._next_tail = None
+
+    def __len__(self):
+        """Return number of used bytes"""
+        return self._read(HEAD_OFFSET) - self._read(TAIL_OFFSET)
+
+    @property
+    def closed(self):
+        """Return True, if the producer closed the ring"""
+        return bool(self._read(CLOSED_OFFSET))
+
+    def close(self):
+        """Mark that no more frames will be written"""
+        INDEX.pack_into(self._memory, CLOSED_OFFSET, 1)
+
+    def release_memory(self):
+        """Unmap the memory and close the file"""
+        self._memory.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def put(self, frame, block=True, timeout=None):
+        """
+        Write the frame. If the ring is full, wait until the consumer frees
+        space, raise Queue.Full, if block is False or timeout is expired.
+        """
+        if self.lock is None:
+            self._put(frame, block, timeout)
+            return
+        with self.lock:
+            self._put(frame, block, timeout)
+
+    def view(self, block=True, timeout=None):
+        """
+        Return the next frame as read only view into the shared memory.
+        The view is valid until release() is called.
+        If the ring is empty, wait, raise Queue.Empty, if block is False or
+        timeout is expired, raise EOFError, if the ring is closed.
+        """
+        if self._next_tail is not None:
+            raise RuntimeError("previous view is not released")
+        memory = self._memory
+        waiter = _Waiter(timeout)
+        while True:
+            tail = self._read(TAIL_OFFSET)
+            head = self._read(HEAD_OFFSET)
+            if tail == head:
+                if self.closed and self._read(HEAD_OFFSET) == tail:
+                    raise EOFError("ring buffer is closed")
+                if not block or not waiter.wait():
+                    raise Queue.Empty
+                continue
+            position = tail % self.capacity
+            contiguous = self.capacity - position
+            if contiguous >= LENGTH.size:
+                length = LENGTH.unpack_from(
+                    memory, DATA_OFFSET + position
+                )[0]
+                if length != WRAP:
+                    self._next_tail = tail + LENGTH.size + length
+                    return buffer(
+                        memory, DATA_OFFSET + position + LENGTH.size, length
+                    )
+            INDEX.pack_into(memory, TAIL_OFFSET, tail + contiguous)
+
+    def release(self):
+        """Free the space of the frame returned by view()"""
+        if self._next_tail is None:
+            raise RuntimeError("there is no view to release")
+        INDEX.pack_into(self._memory, TAIL_OFFSET, self._next_tail)
+        self._next_tail = None
+
+    def get(self, block=True, timeout=None):
+        """Return copy of the next frame, arguments are the same as view()"""
+        frame = self.view(block, timeout)[:]
+        self.release()
+        return frame
+
+    def _read(self, offset):
+        """Return index stored at offset"""
+        return INDEX.unpack_from(self._memory, offset)[0]
+
+    def _put(self, frame, block, timeout):
+        """Write the frame, the caller holds the lock of producers"""
+        need = LENGTH.size + len(frame)
+        if need > self.capacity // 2:
+            raise ValueError("frame is bigger than half of the ring buffer")
+        memory = self._memory
+        waiter = _Waiter(timeout)
+        while True:
+            head = self._read(HEAD_OFFSET)
+            position = head % self.capacity
+            contiguous = self.capacity - position
+            skip = contiguous if need > contiguous else 0
+            free = self.capacity - (head - self._read(TAIL_OFFSET))
+            if free >= skip + need:
+                break
+            if not block or not waiter.wait():
+                raise Queue.Full
+        if skip:
+            if skip >= LENGTH.size:
+                LENGTH.pack_into(memory, DATA_OFFSET + position, WRAP)
+            head += skip
+            position = 0
+        start = DATA_OFFSET + position
+        LENGTH.pack_into(memory, start, len(frame))
+        memory[start + LENGTH.size:start + need] = frame
+        INDEX.pack_into(memory, HEAD_OFFSET, head + need)
+
+
+class _Waiter(object):
+    """Sleep with growing interval until timeout"""
+    def __init__(self, timeout):
+        """Initialization fields"""
+        self.deadline = None
+        if timeout is not None:
+            self.deadline = time.time() + timeout
+        self.interval = 0.00001
+
+    def wait(self):
+        """Sleep, return False, if timeout is expired"""
+        if self.deadline is not None and time.time() >= self.deadline:
+            return False
+        time.sleep(self.interval)
+        self.interval = min(self.interval * 2, MAX_WAIT)
+        return True
+
+
+def iter_messages(ring, pars=None, on_error=None):
+    """
+    Generator the instances 'Message' of the frames read from the ring
+    until it is closed. Arguments are the same as capture.iter_messages.
+    The frame is parsed directly from the view into the shared memory, only
+    the frame, which is not parsed, is copied for on_error.
+    """
+    if pars is None:
+        pars = engines.create_parser()
+    get_payload = pars.get_payload_bytes
+    report = None
+    if on_error is not None:
+        def report(view, error):
+            """Pass copy of the view, its memory is reused after release"""
+            on_error(view[:], error)
+    while True:
+        try:
+            view = ring.view()
+        except EOFError:
+            return
+        try:
+            message = capture.parse_frame(get_payload, view, report)
+        finally:
+            # the memory of the view is reused after release
+            pars.frame_bytes = None
+            ring.release()
+        if message is not None:
+            yield message
@@ -0,0 +1,124 @@
+"""Scheduling link control frames before bulk I-frames."""
+import collections
+import Queue
+
+import address
+import parser
+
+# the field "control" follows the flag, the field "format" and two addresses
+ADDRESS_OFFSET = 3
+BULK_EVERY = 8
+WINDOW = 256
+
+
+def _control_types():
+    """Return type of the command for every value of the field "control" """
+    pars = parser.Parser()
+    return tuple(
+        pars._define_type_field_control(  # pylint: disable=protected-access
+            pars._get_send(value),  # pylint: disable=protected-access
+            pars._get_recive(value),  # pylint: disable=protected-access
+            pars._get_lsb(value),  # pylint: disable=protected-access
+        )
+        for value in range(256)
+    )
+
+
+CONTROL_TYPES = _control_types()
+
+
+def _classify(frame):
+    """
+    Return (link, type of the command), link is the bytes of destination
+    and source addresses
+    """
+    position = ADDRESS_OFFSET
+    for _ in range(2):
+        position += address.decode_address(frame, position)[1]
+    if position >= len(frame):
+        return frame[ADDRESS_OFFSET:], ''
+    command = CONTROL_TYPES[ord(frame[position])]
+    return frame[ADDRESS_OFFSET:position], command
+
+
+def classify(frame):
+    """
+    Return type of the command (one of parser.COMMAND_TYPES) of the frame in
+    bytes, only the addresses and the field "control" are read.
+    Return empty string, if the frame is too short.
+    """
+    return _classify(frame)[1]
+
+
+class FrameScheduler(object):
+    """
+    Two queues of frames: supervisory and unnumbered frames are served
+    before I-frames of other links, but after "bulk_every" frames of the
+    first queue one waiting I-frame is served, so I-frames always make
+    progress.
+    Frames of one link (pair of addresses) keep their order: the frame of
+    the link, which has frames waiting in the queue of I-frames, is queued
+    after them, and the I-frame is not served before the earlier control
+    frames of its link.
+    """
+    def __init__(self, bulk_every=BULK_EVERY):
+        """Initialization fields"""
+        if bulk_every < 1:
+            raise ValueError("bulk_every must be positive")
+        self.bulk_every = bulk_every
+        self.control = collections.deque()
+        self.bulk = collections.deque()
+        self._waiting_control = collections.defaultdict(int)
+        self._waiting_bulk = collections.defaultdict(int)
+        self._served_control = 0
+
+    def __len__(self):
+        """Return number of waiting frames"""
+        return len(self.control) + len(self.bulk)
+
+    def put(self, frame):
+        """Add the frame to its queue, return type of the command"""
+        link, command = _classify(frame)
+        if command == 'I' or link in self._waiting_bulk:
+            self.bulk.append((link, frame))
+            self._waiting_bulk[link] += 1
+        else:
+            self.control.append((link, frame))
+            self._waiting_control[link] += 1
+        return command
+
+    def get(self):
+        """Return the next frame, raise Queue.Empty, if there is no frame"""
+        if self.bulk and (not self.control or (
+                self._served_control >= self.bulk_every and
+                self.bulk[0][0] not in self._waiting_control)):
+            self._served_control = 0
+            return self._pop(self.bulk, self._waiting_bulk)
+        if self.control:
+            self._served_control += 1
+            return self._pop(self.control, self._waiting_control)
+        raise Queue.Empty
+
+    @staticmethod
+    def _pop(queue, waiting):
+        """Return the first frame of the queue, update counter of its link"""
+        link, frame = queue.popleft()
+        waiting[link] -= 1
+        if not waiting[link]:
+            del waiting[link]
+        return frame
+
+
+def schedule(frames, window=WINDOW, bulk_every=BULK_EVERY):
+    """
+    Generator of the frames in bytes in the order of priority.
+    Up to "window" frames are read ahead, so the control frame waits behind
+    not more than "window" I-frames in the input.
+    """
+    scheduler = FrameScheduler(bulk_every)
+    for frame in frames:
+        scheduler.put(frame)
+        if len(scheduler) >= window:
+            yield scheduler.get()
+    while scheduler:
+        yield scheduler.get()
@@ -0,0 +1,208 @@
+"""Writing parsed messages in JSON Lines, CSV and binary records."""
+import csv
+import operator
+import struct
+
+import parser
+
+FIELDS = [
+    ('flag', 'flag', 'str'),
+    ('frame_len', 'frame_format.frame_len', 'int'),
+    ('fragmention_bit', 'frame_format.fragmention_bit', 'str'),
+    ('format_type', 'frame_format.format_type', 'int'),
+    ('dest_addr', 'dest_addr', 'str'),
+    ('scr_addr', 'scr_addr', 'str'),
+    ('lsb', 'control.lsb', 'int'),
+    ('command_response', 'control.command_response', 'str'),
+    ('recive', 'control.recive', 'int'),
+    ('send', 'control.send', 'int'),
+    ('poll_finall', 'control.poll_finall', 'int'),
+    ('hcs', 'hcs', 'int'),
+    ('information', 'information', 'str'),
+    ('fcs', 'fcs', 'int'),
+    ('flag_end', 'flag_end', 'str'),
+]
+
+COMMAND_CODES = dict(
+    (name, code) for code, name in enumerate(parser.COMMAND_TYPES)
+)
+
+# frame_len, flags, format type nibble, dest_addr, dest_addr length, scr_addr,
+# scr_addr length, lsb, command, recive, send, poll_finall, hcs, fcs,
+# length "information"
+RECORD = struct.Struct('<HBBIBIBBBBBBHHH')
+FLAG_FRAGMENTATION = 0x1
+FLAG_INFORMATION = 0x2
+FORMAT_TYPE_3 = 0xa
+
+# fields, which are None in the frames without the field "information"
+OPTIONAL_FIELDS = ('information', 'fcs')
+JSON_SPECS = {'str': '"%s"', 'int': '%d'}
+
+_GET_VALUES = operator.attrgetter(*[path for _, path, _ in FIELDS])
+_GET_HEADER_VALUES = operator.attrgetter(*[
+    path for name, path, _ in FIELDS if name not in OPTIONAL_FIELDS
+])
+
+
+def _json_template(optional):
+    """
+    Return template of JSON object for values of the fields.
+    If optional is False, the optional fields are written as null.
+    """
+    items = []
+    for name, _, kind in FIELDS:
+        spec = JSON_SPECS[kind]
+        if not optional and name in OPTIONAL_FIELDS:
+            spec = 'null'
+        items.append('"{}":{}'.format(name, spec))
+    return '{' + ','.join(items) + '}\n'
+
+
+class Writer(object):
+    """Base class the writers, subclasses define method write"""
+    def write(self, message):
+        """Write one message"""
+        raise NotImplementedError
+
+    def write_all(self, messages):
+        """Write all messages, return their number"""
+        count = 0
+        write = self.write
+        for message in messages:
+            write(message)
+            count += 1
+        return count
+
+
+class JsonLinesWriter(Writer):
+    """Write messages as JSON objects, one per line"""
+    def __init__(self, fileobj):
+        """Initialization fields"""
+        self._write = fileobj.write
+        self._template = _json_template(True)
+        self._header_template = _json_template(False)
+
+    def write(self, message):
+        """Write one message"""
+        if message.fcs is None:
+            self._write(self._header_template % _GET_HEADER_VALUES(message))
+        else:
+            self._write(self._template % _GET_VALUES(message))
+
+
+class CsvWriter(Writer):
+    """Write messages as CSV rows, None is written as empty value"""
+    def __init__(self, fileobj, header=True):
+        """Initialization fields"""
+        self._writer = csv.writer(fileobj, lineterminator='\n')
+        if header:
+            self._writer.writerow([name for name, _, _ in FIELDS])
+
+    def write(self, message):
+        """Write one message"""
+        self._writer.writerow(_GET_VALUES(message))
+
+
+class BinaryWriter(Writer):
+    """
+    Write messages as binary records: the fixed header RECORD and the bytes
+    of the field "information"
+    """
+    def __init__(self, fileobj):
+        """Initialization fields"""
+        self._write = fileobj.write
+        self._pack = RECORD.pack
+
+    def write(self, message):
+        """Write one message"""
+        frame_format = message.frame_format
+        control = message.control
+        flags = 0
+        if frame_format.fragmention_bit == 'True':
+            flags |= FLAG_FRAGMENTATION
+        information = ''
+        fcs = 0
+        if message.information is not None:
+            flags |= FLAG_INFORMATION
+            information = message.information.decode('hex')
+            fcs = message.fcs
+        self._write(self._pack(
+            frame_format.frame_len,
+            flags,
+            _format_nibble(frame_format.format_type),
+            int(message.dest_addr, 16),
+            len(message.dest_addr) // 2,
+            int(message.scr_addr, 16),
+            len(message.scr_addr) // 2,
+            control.lsb,
+            COMMAND_CODES[control.command_response],
+            control.recive,
+            control.send,
+            control.poll_finall,
+            message.hcs,
+            fcs,
+            len(information),
+        ) + information)
+
+
+def _format_nibble(format_type):
+    """
+    Return 4 bits of the format type: the parser gives 3 for the type 0xA,
+    other types are the masked field "format"
+    """
+    if format_type == 3:
+        return FORMAT_TYPE_3
+    return format_type >> 12
+
+
+def _format_address(value, size):
+    """Return address in hex with the given number of bytes"""
+    return '{:0{}x}'.format(value, size * 2)
+
+
+def read_binary(fileobj):
+    """Generator, which read binary records and yield instances 'Message'"""
+    size = RECORD.size
+    unpack = RECORD.unpack
+    while True:
+        header = fileobj.read(size)
+        if not header:
+            return
+        if len(header) < size:
+            raise ValueError("truncated binary record")
+        (frame_len, flags, format_nibble, dest_addr, dest_len, scr_addr,
+         scr_len, lsb, command, recive, send, poll_finall, hcs, fcs,
+         info_len) = unpack(header)
+        information = None
+        if flags & FLAG_INFORMATION:
+            information = fileobj.read(info_len).encode('hex')
+        else:
+            fcs = None
+        format_type = format_nibble << 12
+        if format_nibble == FORMAT_TYPE_3:
+            format_type = 3
+        fragmention_bit = 'False'
+        if flags & FLAG_FRAGMENTATION:
+            fragmention_bit = 'True'
+        yield parser.Message(
+            flag='7e',
+            frame_format=parser.FrameFormat(
+                frame_len=frame_len,
+                fragmention_bit=fragmention_bit,
+                format_type=format_type,
+            ),
+            dest_addr=_format_address(dest_addr, dest_len),
+            scr_addr=_format_address(scr_addr, scr_len),
+            control=parser.Control(
+                lsb=lsb,
+                command_response=parser.COMMAND_TYPES[command],
+                recive=recive,
+                send=send,
+                poll_finall=poll_finall,
+            ),
+            hcs=hcs,
+            information=information,
+            fcs=fcs,
+            flag_end='7e',
+        )
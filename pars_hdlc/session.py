@@ -0,0 +1,171 @@
+"""Tracking N(S)/N(R) sequence numbers of HDLC links."""
+import array
+import time
+
+SEQUENCE_OK = 'OK'
+SEQUENCE_NEW = 'NEW'
+SEQUENCE_LOST = 'LOST'
+SEQUENCE_DUPLICATE = 'DUPLICATE'
+LINK_RESET = 'RESET'
+
+RESET_COMMANDS = frozenset(['SNRM', 'DISC', 'UA'])
+SEQUENCE_MODULO = 8
+DUPLICATE_WINDOW = 4
+UNKNOWN = -1
+
+
+class SessionTracker(object):
+    """
+    State of links, keyed by (dest_addr, scr_addr).
+    The state of the link is stored in the arrays by the slot number, slots
+    are linked in the list from the most to the least recently used link,
+    so update and eviction the idle links take O(1) per frame.
+    I-frame, which N(S) is up to "duplicate_window" behind the expected
+    N(S), is the retransmission of the outstanding frame, otherwise the
+    frames between the expected and the received N(S) are lost.
+    """
+    def __init__(self, capacity=131072, idle_timeout=900.0,
+                 duplicate_window=DUPLICATE_WINDOW):
+        """Initialization fields"""
+        self.capacity = capacity
+        self.idle_timeout = idle_timeout
+        self.duplicate_window = duplicate_window
+        self.lost = 0
+        self.duplicates = 0
+        self.evicted = 0
+        size = capacity + 1
+        self._head = capacity
+        self._index = {}
+        self._keys = [None] * capacity
+        self._free = range(capacity - 1, -1, -1)
+        self._expected_send = array.array('b', [UNKNOWN]) * size
+        self._last_recive = array.array('b', [UNKNOWN]) * size
+        self._last_seen = array.array('d', [0.0]) * size
+        self._prev = array.array('l', [self._head]) * size
+        self._next = array.array('l', [self._head]) * size
+
+    def __len__(self):
+        """Return number of tracked links"""
+        return len(self._index)
+
+    def __contains__(self, key):
+        """Check that the link (dest_addr, scr_addr) is tracked"""
+        return key in self._index
+
+    def get_state(self, key):
+        """
+        Return (expected N(S), last N(R), last seen time) of the link or
+        None, if the link is not tracked
+        """
+        slot = self._index.get(key)
+        if slot is None:
+            return None
+        return (
+            self._expected_send[slot],
+            self._last_recive[slot],
+            self._last_seen[slot],
+        )
+
+    def update(self, message, now=None):
+        """
+        Update state of the link by the parsed message.
+
+        Args:
+            message
+                instance 'Message'
+            now
+                time of the frame, by default current time
+
+        Returns:
+            event: SEQUENCE_OK, SEQUENCE_NEW, SEQUENCE_LOST,
+            SEQUENCE_DUPLICATE or LINK_RESET
+        """
+        if now is None:
+            now = time.time()
+        self._evict_idle(now, 2)
+        key = (message.dest_addr, message.scr_addr)
+        slot = self._index.get(key)
+        event = SEQUENCE_OK
+        if slot is None:
+            slot = self._allocate(key)
+            event = SEQUENCE_NEW
+        else:
+            self._unlink(slot)
+        self._link_first(slot)
+        self._last_seen[slot] = now
+
+        control = message.control
+        command = control.command_response
+        if command in RESET_COMMANDS:
+            self._expected_send[slot] = 0
+            self._last_recive[slot] = UNKNOWN
+            return LINK_RESET
+        if control.lsb == 0 or command in ('RR', 'RNR'):
+            self._last_recive[slot] = control.recive >> 5
+        if command != 'I':
+            return event
+
+        send = control.send >> 1
+        expected = self._expected_send[slot]
+        if expected == UNKNOWN or send == expected:
+            self._expected_send[slot] = (send + 1) % SEQUENCE_MODULO
+            return event
+        if 0 < (expected - send) % SEQUENCE_MODULO <= self.duplicate_window:
+            self.duplicates += 1
+            return SEQUENCE_DUPLICATE
+        self._expected_send[slot] = (send + 1) % SEQUENCE_MODULO
+        self.lost += (send - expected) % SEQUENCE_MODULO
+        return SEQUENCE_LOST
+
+    def evict_idle(self, now=None):
+        """Remove all links, which are idle longer than idle_timeout"""
+        if now is None:
+            now = time.time()
+        return self._evict_idle(now, self.capacity)
+
+    def _evict_idle(self, now, limit):
+        """Remove up to limit least recently used idle links"""
+        count = 0
+        deadline = now - self.idle_timeout
+        while count < limit:
+            slot = self._prev[self._head]
+            if slot == self._head or self._last_seen[slot] > deadline:
+                break
+            self._release(slot)
+            count += 1
+        self.evicted += count
+        return count
+
+    def _allocate(self, key):
+        """Return free slot for the new link"""
+        if not self._free:
+            self._release(self._prev[self._head])
+            self.evicted += 1
+        slot = self._free.pop()
+        self._index[key] = slot
+        self._keys[slot] = key
+        self._expected_send[slot] = UNKNOWN
+        self._last_recive[slot] = UNKNOWN
+        return slot
+
+    def _release(self, slot):
+        """Remove the link and return its slot to the free list"""
+        self._unlink(slot)
+        del self._index[self._keys[slot]]
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def _unlink(self, slot):
+        """Remove the slot from the list of the used slots"""
+        prev_slot = self._prev[slot]
+        next_slot = self._next[slot]
+        self._next[prev_slot] = next_slot
+        self._prev[next_slot] = prev_slot
+
+    def _link_first(self, slot):
+        """Insert the slot as the most recently used"""
+        first = self._next[self._head]
+        self._prev[slot] = self._head
+        self._next[slot] = first
+        self._prev[first] = slot
+        self._next[self._head] = slot
@@ -0,0 +1,474 @@
+"""Fleet of virtual meters on loopback TCP and load test harness."""
+import argparse
+import array
+import collections
+import errno
+import heapq
+import itertools
+import math
+import random
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+
+import address
+import apdu
+import capture
+import check_summ
+import engines
+
+CONTROL_SNRM = 0x93
+CONTROL_DISC = 0x53
+CONTROL_UA = 0x73
+POLL_FINAL = 0x10
+SEGMENTATION = 0x0800
+FORMAT_TYPE_3 = 0xa000
+CLIENT_ADDRESS = 0x10
+GET_REQUEST = apdu.LLC_REQUEST + 'c001c100030100010800ff0200'.decode('hex')
+READ_SIZE = 65536
+POLL_TIMEOUT = 100
+
+LoadResult = collections.namedtuple(
+    'LoadResult',
+    [
+        'links',
+        'polls',
+        'frames',
+        'errors',
+        'elapsed',
+        'frames_per_second',
+        'p50',
+        'p99',
+        'p999',
+    ]
+)
+
+
+def build_frame(dest_addr, scr_addr, control, information='',
+                segmented=False):
+    """
+    Return HDLC frame in bytes.
+
+    Args:
+        dest_addr
+            bytes of destination address
+        scr_addr
+            bytes of source address
+        control
+            value of the field "control"
+        information
+            bytes of the field "information"
+        segmented
+            value of the segmentation bit
+    """
+    header_len = 2 + len(dest_addr) + len(scr_addr) + 1
+    frame_len = header_len + 2
+    if information:
+        frame_len += len(information) + 2
+    frame_format = FORMAT_TYPE_3 | frame_len
+    if segmented:
+        frame_format |= SEGMENTATION
+    header = (struct.pack('>H', frame_format) + dest_addr + scr_addr +
+              chr(control))
+    frame = header + struct.pack('<H', check_summ.checksum(header))
+    if information:
+        frame += information
+        frame += struct.pack('<H', check_summ.checksum(frame))
+    return capture.FLAG + frame + capture.FLAG
+
+
+def i_control(send, recive, poll=True):
+    """Return the field "control" of I-frame"""
+    control = (recive & 0x7) << 5 | (send & 0x7) << 1
+    if poll:
+        control |= POLL_FINAL
+    return control
+
+
+def rr_control(recive):
+    """Return the field "control" of RR frame"""
+    return (recive & 0x7) << 5 | POLL_FINAL | 0x1
+
+
+def percentile(values, fraction):
+    """Return nearest rank percentile of the sorted values"""
+    if not values:
+        return None
+    rank = int(math.ceil(fraction * len(values))) - 1
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+def _poller():
+    """Return select.poll, it is not limited by FD_SETSIZE like select"""
+    return select.poll()
+
+
+def _set_nodelay(sock):
+    """Disable Nagle algorithm for the small frames"""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class VirtualMeter(object):
+    """
+    Server side of one connection. Answer SNRM and DISC with UA, the I-frame
+    poll with the response split into segments, RR with the next segment.
+    """
+    def __init__(self, fleet):
+        """Initialization fields"""
+        self.fleet = fleet
+        self.deframer = capture.Deframer()
+        self.parser = engines.create_parser()
+        self.pending = collections.deque()
+        self.send = 0
+        self.recive = 0
+
+    def feed(self, data):
+        """Return list of frames to send for the received bytes"""
+        responses = []
+        for frame in self.deframer.feed(data):
+            try:
+                message = self.parser.get_payload_bytes(frame)
+            except capture.PARSE_ERRORS:
+                continue
+            responses.extend(self.handle(message))
+        return responses
+
+    def handle(self, message):
+        """Return list of frames answering the message"""
+        fleet = self.fleet
+        dest_addr = message.scr_addr.decode('hex')
+        scr_addr = message.dest_addr.decode('hex')
+        command = message.control.command_response
+        if command in ('SNRM', 'DISC'):
+            self.send = self.recive = 0
+            self.pending.clear()
+            return [build_frame(dest_addr, scr_addr, CONTROL_UA)]
+        if command == 'I':
+            self.recive = ((message.control.send >> 1) + 1) % 8
+            self.pending.clear()
+            segments = fleet.segments
+            payload = fleet.response
+            size = int(math.ceil(len(payload) / float(segments)))
+            for number in range(segments):
+                self.pending.append((
+                    payload[number * size:(number + 1) * size],
+                    number < segments - 1,
+                ))
+        elif command != 'RR':
+            return []
+        if not self.pending:
+            return [build_frame(dest_addr, scr_addr, rr_control(self.recive))]
+        information, segmented = self.pending.popleft()
+        frame = build_frame(
+            dest_addr, scr_addr, i_control(self.send, self.recive),
+            information, segmented
+        )
+        self.send = (self.send + 1) % 8
+        if fleet.error_ratio and fleet.random.random() < fleet.error_ratio:
+            frame = frame[:-3] + chr(ord(frame[-3]) ^ 0xff) + frame[-2:]
+        return [frame]
+
+
+class MeterFleet(object):
+    """
+    Virtual meters listening on one loopback TCP port, every accepted
+    connection is one meter. The meters run in the separate thread.
+
+    Args:
+        response_size
+            size of the response to the poll in bytes (with LLC header)
+        segments
+            number of frames, the response is split into
+        error_ratio
+            part of the response frames with corrupted FCS
+        response_delay
+            time in seconds, the meter waits before the answer
+    """
+    def __init__(self, host='127.0.0.1', port=0, response_size=128,
+                 segments=1, error_ratio=0.0, response_delay=0.0, seed=None):
+        """Initialization fields"""
+        self.segments = segments
+        self.error_ratio = error_ratio
+        self.response_delay = response_delay
+        self.random = random.Random(seed)
+        body = ''.join(
+            chr(self.random.randrange(256))
+            for _ in range(max(response_size - 6, 0))
+        )
+        self.response = apdu.LLC_RESPONSE + '\xc4\x01\xc1' + body
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind((host, port))
+        self._listener.listen(1024)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def address(self):
+        """Return (host, port) of the fleet"""
+        return self._listener.getsockname()
+
+    def start(self):
+        """Start the meters in the thread"""
+        self._thread = threading.Thread(target=self._run, name='meter-fleet')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the meters and close the sockets"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._listener.close()
+
+    def __enter__(self):
+        """Start the fleet in with statement"""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Stop the fleet in with statement"""
+        self.stop()
+
+    def _run(self):
+        """
+        Event loop of the meters. The delayed responses are kept in the heap
+        by the time of sending, so the delay of one meter does not block
+        the others.
+        """
+        poller = _poller()
+        listener_fd = self._listener.fileno()
+        poller.register(listener_fd, select.POLLIN)
+        connections = {}
+        delayed = []
+        sequence = itertools.count()
+        try:
+            while not self._stopped.is_set():
+                timeout = POLL_TIMEOUT
+                if delayed:
+                    timeout = min(
+                        timeout, max(delayed[0][0] - time.time(), 0) * 1000
+                    )
+                for fileno, _ in poller.poll(timeout):
+                    if fileno == listener_fd:
+                        sock, _ = self._listener.accept()
+                        _set_nodelay(sock)
+                        connections[sock.fileno()] = (sock, VirtualMeter(self))
+                        poller.register(sock, select.POLLIN)
+                        continue
+                    sock, meter = connections[fileno]
+                    data = self._recv(sock)
+                    if not data:
+                        poller.unregister(fileno)
+                        del connections[fileno]
+                        sock.close()
+                        continue
+                    responses = meter.feed(data)
+                    if not responses:
+                        continue
+                    if self.response_delay:
+                        heapq.heappush(delayed, (
+                            time.time() + self.response_delay,
+                            next(sequence), fileno, sock, ''.join(responses),
+                        ))
+                    else:
+                        sock.sendall(''.join(responses))
+                now = time.time()
+                while delayed and delayed[0][0] <= now:
+                    _, _, fileno, sock, data = heapq.heappop(delayed)
+                    # the connection may be closed while the response waits
+                    if connections.get(fileno, (None,))[0] is sock:
+                        sock.sendall(data)
+        finally:
+            for sock, _ in connections.values():
+                sock.close()
+
+    @staticmethod
+    def _recv(sock):
+        """Return received bytes, empty string if the connection is closed"""
+        try:
+            return sock.recv(READ_SIZE)
+        except socket.error as error:
+            if error.errno == errno.ECONNRESET:
+                return ''
+            raise
+
+
+class _Link(object):
+    """Client side of one connection in the harness"""
+    def __init__(self, sock, server_addr):
+        """Initialization fields"""
+        self.sock = sock
+        self.server_addr = server_addr
+        self.client_addr = address.encode_address(CLIENT_ADDRESS)
+        self.deframer = capture.Deframer()
+        self.send = 0
+        self.recive = 0
+        self.polls = 0
+        self.poll_sent = None
+        self.next_poll = 0.0
+        self.connected = False
+
+    def write(self, control, information=''):
+        """Send frame to the meter"""
+        self.sock.sendall(build_frame(
+            self.server_addr, self.client_addr, control, information
+        ))
+
+    def poll(self, now):
+        """Send the poll (get-request)"""
+        self.write(i_control(self.send, self.recive), GET_REQUEST)
+        self.send = (self.send + 1) % 8
+        self.poll_sent = now
+
+
+class LoadHarness(object):
+    """
+    Open "links" connections to the fleet, connect every link with SNRM and
+    send "polls" polls per link, not more than "rate" polls per second per
+    link. The responses go through capture.Deframer and Parser, the latency
+    is the time from the poll to the parsed last segment of the response.
+    Both the harness and the fleet use one descriptor per link, so the limit
+    of open files must be bigger than twice the number of links.
+    """
+    def __init__(self, fleet_address, links=100, polls=10, rate=None,
+                 timeout=60.0):
+        """Initialization fields"""
+        self.fleet_address = fleet_address
+        self.links = links
+        self.polls = polls
+        self.interval = 1.0 / rate if rate else 0.0
+        self.timeout = timeout
+        self.latencies = array.array('d')
+        self.frames = 0
+        self.errors = 0
+        self.parser = engines.create_parser()
+
+    def run(self):
+        """Run the load test, return instance 'LoadResult'"""
+        poller = _poller()
+        links = {}
+        started = time.time()
+        for number in range(self.links):
+            sock = socket.create_connection(self.fleet_address)
+            _set_nodelay(sock)
+            server_addr = address.encode_address(1, 0x10 + number % 0x3f00)
+            link = _Link(sock, server_addr)
+            links[sock.fileno()] = link
+            poller.register(sock, select.POLLIN)
+            link.write(CONTROL_SNRM)
+        active = len(links)
+        deadline = started + self.timeout
+        try:
+            while active:
+                now = time.time()
+                if now > deadline:
+                    raise RuntimeError("load test timeout")
+                for fileno, _ in poller.poll(10):
+                    link = links[fileno]
+                    data = link.sock.recv(READ_SIZE)
+                    if not data:
+                        raise RuntimeError("meter closed the connection")
+                    for frame in link.deframer.feed(data):
+                        if self._handle(link, frame, time.time()):
+                            active -= 1
+                now = time.time()
+                for link in links.itervalues():
+                    if (link.connected and link.poll_sent is None and
+                            link.polls < self.polls and
+                            link.next_poll <= now):
+                        link.poll(now)
+        finally:
+            for link in links.itervalues():
+                link.sock.close()
+        elapsed = time.time() - started
+        latencies = sorted(self.latencies)
+        return LoadResult(
+            links=self.links,
+            polls=len(latencies),
+            frames=self.frames,
+            errors=self.errors,
+            elapsed=elapsed,
+            frames_per_second=self.frames / elapsed if elapsed else 0.0,
+            p50=percentile(latencies, 0.5),
+            p99=percentile(latencies, 0.99),
+            p999=percentile(latencies, 0.999),
+        )
+
+    def _handle(self, link, frame, now):
+        """Handle the received frame, return True, if the link is done"""
+        try:
+            message = self.parser.get_payload_bytes(frame)
+        except capture.PARSE_ERRORS:
+            self.errors += 1
+            if link.poll_sent is not None:
+                link.poll(now)
+            return False
+        self.frames += 1
+        control = message.control
+        if control.command_response == 'UA':
+            link.connected = True
+            return self.polls == 0
+        if control.command_response != 'I':
+            return False
+        link.recive = ((control.send >> 1) + 1) % 8
+        if message.frame_format.fragmention_bit == 'True':
+            link.write(rr_control(link.recive))
+            return False
+        self.latencies.append(now - link.poll_sent)
+        link.poll_sent = None
+        link.polls += 1
+        link.next_poll = now + self.interval
+        return link.polls >= self.polls
+
+
+def create_argument_parser():
+    """Return parser of the command line arguments"""
+    arguments = argparse.ArgumentParser(
+        description='Load test the parser with the fleet of virtual meters'
+    )
+    arguments.add_argument('--meters', type=int, default=1000,
+                           help='number of virtual meters (links)')
+    arguments.add_argument('--polls', type=int, default=10,
+                           help='number of polls per meter')
+    arguments.add_argument('--rate', type=float, default=None,
+                           help='polls per second per meter')
+    arguments.add_argument('--size', type=int, default=128,
+                           help='size of the response in bytes')
+    arguments.add_argument('--segments', type=int, default=1,
+                           help='number of frames per response')
+    arguments.add_argument('--error-ratio', type=float, default=0.0,
+                           help='part of the frames with wrong FCS')
+    arguments.add_argument('--timeout', type=float, default=600.0,
+                           help='maximal time of the test in seconds')
+    return arguments
+
+
+def main(argv=None, out=None):
+    """Run the fleet and the harness, print the results"""
+    args = create_argument_parser().parse_args(argv)
+    if out is None:
+        out = sys.stdout
+    with MeterFleet(response_size=args.size, segments=args.segments,
+                    error_ratio=args.error_ratio) as fleet:
+        result = LoadHarness(
+            fleet.address, args.meters, args.polls, args.rate, args.timeout
+        ).run()
+    out.write('Links: {}\n'.format(result.links))
+    out.write('Polls: {}\n'.format(result.polls))
+    out.write('Frames: {}, errors: {}\n'.format(result.frames, result.errors))
+    out.write('Time: {:.3f} s, {:.0f} frames/s\n'.format(
+        result.elapsed, result.frames_per_second
+    ))
+    if result.polls:
+        out.write('Latency p50/p99/p999: {:.3f}/{:.3f}/{:.3f} ms\n'.format(
+            result.p50 * 1e3, result.p99 * 1e3, result.p999 * 1e3
+        ))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""Command line tool, which print traffic statistics of HDLC captures."""
+import argparse
+import array
+import sys
+import time
+
+import capture
+import checkpoint
+import parser
+
+MAX_FRAME_LEN = 0x7ff
+
+
+class SpaceSaving(object):
+    """
+    Heavy hitters sketch "Space-Saving".
+    Keep not more than "size" counters, the counter of the new key replaces
+    the minimal counter, so the estimated count is never less than the real.
+    Keys are grouped in buckets by count ("stream summary"), so the minimal
+    counter is found and every update is done in O(1).
+    """
+    def __init__(self, size):
+        """Initialization fields"""
+        self.size = size
+        self.counts = {}
+        self.errors = {}
+        self._buckets = {}
+        self._min_count = 0
+
+    def add(self, key):
+        """Count the key"""
+        counts = self.counts
+        count = counts.get(key)
+        if count is not None:
+            self._move(key, count)
+        elif len(counts) < self.size:
+            counts[key] = 1
+            self.errors[key] = 0
+            self._buckets.setdefault(1, set()).add(key)
+            self._min_count = 1
+        else:
+            count = self._min_count
+            victim = self._buckets[count].pop()
+            del counts[victim]
+            del self.errors[victim]
+            counts[key] = count
+            self.errors[key] = count
+            self._buckets[count].add(key)
+            self._move(key, count)
+
+    def _move(self, key, count):
+        """Move the key from the bucket count to the bucket count + 1"""
+        buckets = self._buckets
+        bucket = buckets[count]
+        bucket.discard(key)
+        if not bucket:
+            del buckets[count]
+            if count == self._min_count:
+                self._min_count = count + 1
+        self.counts[key] = count + 1
+        buckets.setdefault(count + 1, set()).add(key)
+
+    def state(self):
+        """Return list [key, count, error] of the counters"""
+        return [
+            [key, count, self.errors[key]]
+            for key, count in self.counts.items()
+        ]
+
+    def restore(self, state):
+        """Set the counters returned by method state"""
+        self.counts = {}
+        self.errors = {}
+        self._buckets = {}
+        for key, count, error in state:
+            self.counts[key] = count
+            self.errors[key] = error
+            self._buckets.setdefault(count, set()).add(key)
+        self._min_count = min(self._buckets) if self._buckets else 0
+
+    def top(self, number):
+        """Return list (key, estimated count, maximal error) by count"""
+        keys = sorted(self.counts, key=self.counts.get, reverse=True)
+        return [
+            (key, self.counts[key], self.errors[key])
+            for key in keys[:number]
+        ]
+
+
+class TrafficStats(object):
+    """Counters of the traffic, their size does not depend on the traffic"""
+    def __init__(self, sketch_size=1024):
+        """Initialization fields"""
+        self.frames = 0
+        self.bytes = 0
+        self.crc_errors = 0
+        self.length_errors = 0
+        self.format_errors = 0
+        self.commands = dict.fromkeys(parser.COMMAND_TYPES, 0)
+        self.lengths = array.array('L', [0]) * (MAX_FRAME_LEN + 1)
+        self.addresses = SpaceSaving(sketch_size)
+
+    def add(self, message):
+        """Count parsed message"""
+        frame_len = message.frame_format.frame_len
+        self.frames += 1
+        self.bytes += frame_len + 2
+        self.commands[message.control.command_response] += 1
+        self.lengths[frame_len] += 1
+        self.addresses.add((message.dest_addr, message.scr_addr))
+
+    def add_error(self, frame, error):
+        """Count not parsed frame"""
+        self.bytes += len(frame)
+        if isinstance(error, parser.CheckSummError):
+            self.crc_errors += 1
+        elif isinstance(error, parser.LenghtError):
+            self.length_errors += 1
+        else:
+            self.format_errors += 1
+
+    @property
+    def errors(self):
+        """Return number of not parsed frames"""
+        return self.crc_errors + self.length_errors + self.format_errors
+
+    def state(self):
+        """Return the counters as dictionary of JSON types"""
+        return {
+            'frames': self.frames,
+            'bytes': self.bytes,
+            'crc_errors': self.crc_errors,
+            'length_errors': self.length_errors,
+            'format_errors': self.format_errors,
+            'commands': self.commands,
+            'lengths': self.lengths.tolist(),
+            'addresses': [
+                [list(key), count, error]
+                for key, count, error in self.addresses.state()
+            ],
+        }
+
+    def restore(self, state):
+        """Set the counters returned by method state"""
+        self.frames = state['frames']
+        self.bytes = state['bytes']
+        self.crc_errors = state['crc_errors']
+        self.length_errors = state['length_errors']
+        self.format_errors = state['format_errors']
+        self.commands = dict(
+            (str(name), count) for name, count in state['commands'].items()
+        )
+        self.lengths = array.array('L', state['lengths'])
+        self.addresses.restore(
+            (tuple(str(part) for part in key), count, error)
+            for key, count, error in state['addresses']
+        )
+
+    def histogram(self):
+        """Return list (from, to, count) the frame lengths by power of two"""
+        result = []
+        low = 0
+        high = 7
+        while low <= MAX_FRAME_LEN:
+            count = sum(self.lengths[low:high + 1])
+            if count:
+                result.append((low, high, count))
+            low = high + 1
+            high = low * 2 - 1
+        return result
+
+    def report(self, out, top=10, elapsed=None):
+        """Write the statistics in text"""
+        total = self.frames + self.errors
+        out.write('Frames: {}\n'.format(self.frames))
+        out.write('Bytes: {}\n'.format(self.bytes))
+        out.write('Errors:\n')
+        for name, count in [('CRC', self.crc_errors),
+                            ('Length', self.length_errors),
+                            ('Format', self.format_errors)]:
+            out.write('\t{}: {} ({:.4%})\n'.format(
+                name, count, float(count) / total if total else 0.0
+            ))
+        out.write('Commands:\n')
+        for name in parser.COMMAND_TYPES:
+            if self.commands[name]:
+                out.write('\t{}: {}\n'.format(
+                    name or 'unknown', self.commands[name]
+                ))
+        out.write('Frame length:\n')
+        for low, high, count in self.histogram():
+            out.write('\t{}-{}: {}\n'.format(low, high, count))
+        out.write('Top addresses (destination, source):\n')
+        for (dest_addr, scr_addr), count, error in self.addresses.top(top):
+            out.write('\t{} {}: {} (+-{})\n'.format(
+                dest_addr, scr_addr, count, error
+            ))
+        if elapsed:
+            out.write('Time: {:.3f} s, {:.0f} frames/s, {:.3f} MB/s\n'.format(
+                elapsed, total / elapsed, self.bytes / elapsed / 1e6
+            ))
+
+
+def create_argument_parser():
+    """Return parser of the command line arguments"""
+    arguments = argparse.ArgumentParser(
+        description='Print traffic statistics of HDLC captures '
+                    '(raw bytes, .gz or .xz)'
+    )
+    arguments.add_argument('captures', nargs='+', help='path to capture')
+    arguments.add_argument(
+        '--top', type=int, default=10,
+        help='number of the most frequent address pairs'
+    )
+    arguments.add_argument(
+        '--sketch-size', type=int, default=1024,
+        help='number of counters for the address pairs'
+    )
+    arguments.add_argument(
+        '--chunk-size', type=int, default=capture.CHUNK_SIZE,
+        help='size of the read chunk in bytes'
+    )
+    arguments.add_argument(
+        '--checkpoint',
+        help='path to the checkpoint file, the run is resumed from it'
+    )
+    arguments.add_argument(
+        '--checkpoint-interval', type=float, default=checkpoint.INTERVAL,
+        help='minimal interval between checkpoints in seconds'
+    )
+    return arguments
+
+
+def main(argv=None, out=None):
+    """Stream the captures and print the statistics"""
+    args = create_argument_parser().parse_args(argv)
+    if out is None:
+        out = sys.stdout
+    stats = TrafficStats(args.sketch_size)
+    add = stats.add
+    started = time.time()
+    if args.checkpoint:
+        checkpoint.CheckpointedJob(
+            args.captures, args.checkpoint, stats,
+            interval=args.checkpoint_interval, chunk_size=args.chunk_size
+        ).run()
+    else:
+        for path in args.captures:
+            frames = capture.read_frames(path, chunk_size=args.chunk_size)
+            for message in capture.iter_messages(frames,
+                                                 on_error=stats.add_error):
+                add(message)
+    stats.report(out, args.top, time.time() - started)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
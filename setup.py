@@ -7,5 +7,11 @@ from setuptools import setup, find_packages
 setup(
     name='pars_hdlc',
     version='1.0',
-    packages=find_packages()
+    packages=find_packages(),
+    entry_points={
+        'console_scripts': [
+            'hdlc-stats = pars_hdlc.stats:main',
+            'hdlc-loadtest = pars_hdlc.simulator:main',
+        ],
+    },
 )
@@ -0,0 +1,54 @@
+"""Tests decoding HDLC addresses."""
+import pytest
+from pars_hdlc import address
+
+
+@pytest.mark.parametrize("test_input,expected", [
+    (("61".decode('hex'), 0), (0x61, 1)),
+    (("7e03".decode('hex'), 1), (0x03, 1)),
+    (("00020023".decode('hex'), 0), (0x00020023, 4)),
+    (("0221".decode('hex'), 0), (0x0221, 2)),
+    (("00000000".decode('hex'), 0), (0, 4)),
+    (("0002".decode('hex'), 0), (0x0002, 2)),
+])
+def test_decode_address(test_input, expected):
+    """Checking decoding integer address and its length."""
+    data, offset = test_input
+    assert address.decode_address(data, offset) == expected
+
+
+@pytest.mark.parametrize("test_input,expected", [
+    ((0x61, 1), (0x30, None)),
+    ((0x0221, 2), (0x01, 0x10)),
+    ((0x00020023, 4), (0x0001, 0x0011)),
+])
+def test_split_address(test_input, expected):
+    """Checking upper and lower HDLC address."""
+    value, size = test_input
+    assert address.split_address(value, size) == expected
+
+
+@pytest.mark.parametrize("test_input", [
+    (0x30, None), (0x01, 0x10), (0x0001, 0x0011), (0x0100, 0x3fff),
+])
+def test_encode_address(test_input):
+    """Checking that encoded address is decoded back."""
+    upper, lower = test_input
+    octets = address.encode_address(upper, lower)
+    value, size = address.decode_address(octets)
+    assert size == len(octets)
+    assert address.split_address(value, size) == test_input
+
+
+def test_split_address_wrong_length():
+    """Checking that wrong length raises error."""
+    with pytest.raises(ValueError):
+        address.split_address(0x0221, 3)
+
+
+def test_intern_address():
+    """Checking that equal addresses are the same object."""
+    first = address.intern_address("0221".decode('hex'))
+    second = address.intern_address("0221".decode('hex'))
+    assert first == '0221'
+    assert first is second
@@ -0,0 +1,73 @@
+"""Tests decoding LLC header and APDU."""
+import pytest
+from pars_hdlc import apdu
+from pars_hdlc import parser
+
+
+@pytest.mark.parametrize("test_input,expected", [
+    (
+        "7ea0586103300751e6e700614aa109060760857405080101a2030201"
+        "00a305a10302010e88020780890760857405080202aa1280106162636"
+        "465666768696a6b6c6d6e6f70be10040e0800065f1f040000181d0164000718d07e",
+        ('AARE', 0x61, True, None, None, 75),
+    ),
+    (
+        "7ea01e61031e56c4e6e700c4018100090c07e10619ff0d2c2fff80000048f27e",
+        ('get-response', 0xc4, True, 0x01, 0x81, 15),
+    ),
+    (
+        "7ea011610330d3bee6e700c70181010052ab7e",
+        ('action-response', 0xc7, True, 0x01, 0x81, 2),
+    ),
+])
+def test_get_apdu(test_input, expected):
+    """Checking decoding APDU of the parsed frame."""
+    pars = parser.Parser()
+    pars.get_payload(test_input)
+    value = pars.get_apdu()
+    name, tag, is_response, choice, invoke_id, body_len = expected
+    assert value.name == name
+    assert value.tag == tag
+    assert value.is_response == is_response
+    assert value.choice == choice
+    assert value.invoke_id_and_priority == invoke_id
+    assert len(value.body) == body_len
+    assert value.llc.tobytes() == apdu.LLC_RESPONSE
+
+
+def test_get_apdu_buffer():
+    """Checking decoding APDU of the frame parsed from buffer."""
+    pars = parser.Parser()
+    frame = "7ea011610330d3bee6e700c70181010052ab7e".decode('hex')
+    pars.get_payload_bytes(buffer(frame))
+    value = pars.get_apdu()
+    assert value.name == 'action-response'
+    assert value.is_response
+    assert value.body.tobytes() == '0100'.decode('hex')
+
+
+@pytest.mark.parametrize("test_input", [
+    "7ea0200361931b9f8180140502080006020800070400000007080400000007b3c67e",
+    "7ea00703413142e27e",
+])
+def test_get_apdu_without_llc(test_input):
+    """Checking, that frames without LLC header are not decoded."""
+    pars = parser.Parser()
+    pars.get_payload(test_input)
+    assert pars.get_apdu() is None
+
+
+def test_decode_hex():
+    """Checking decoding the field "information" in hex."""
+    value = apdu.decode_hex('e6e600c001c100010000600100ff0200')
+    assert value.name == 'get-request'
+    assert not value.is_response
+    assert value.payload.tobytes() == 'c001c100010000600100ff0200'.decode('hex')
+    assert value.body.tobytes() == '00010000600100ff0200'.decode('hex')
+
+
+def test_decode_unknown_tag():
+    """Checking decoding APDU with unknown tag."""
+    value = apdu.decode_hex('e6e700ff01')
+    assert value.name == 'unknown'
+    assert value.choice is None
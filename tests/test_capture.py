@@ -0,0 +1,121 @@
+"""Tests reading HDLC frames from captures."""
+import gzip
+import StringIO
+import zlib
+import pytest
+from pars_hdlc import capture
+from pars_hdlc import parser
+
+FRAMES = [
+    "7ea011610330d3bee6e700c70181010052ab7e".decode('hex'),
+    "7ea00703413142e27e".decode('hex'),
+    "7ea0200361931b9f818014050208000602080007040000000708040000"
+    "0007b3c67e".decode('hex'),
+]
+STREAM = 'garbage' + ''.join(FRAMES) + '\x7e'
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64, 1024])
+def test_deframer(chunk_size):
+    """Checking splitting the stream into frames by any chunks."""
+    deframer = capture.Deframer()
+    frames = []
+    for start in range(0, len(STREAM), chunk_size):
+        frames.extend(deframer.feed(STREAM[start:start + chunk_size]))
+    assert frames == FRAMES
+    assert deframer.discarded == len('garbage')
+    assert deframer.tail == '\x7e\x7e'
+    assert deframer.offset == len(STREAM) - 2
+
+
+def test_deframer_shared_flag():
+    """Checking frames, which share the flag."""
+    stream = FRAMES[0] + FRAMES[1][1:] + FRAMES[2][1:]
+    deframer = capture.Deframer()
+    assert list(deframer.feed(stream)) == FRAMES
+    assert deframer.discarded == 0
+
+
+def test_read_frames_plain(tmpdir):
+    """Checking reading frames from not compressed capture."""
+    path = tmpdir.join('capture.bin')
+    path.write(STREAM, mode='wb')
+    assert list(capture.read_frames(str(path), chunk_size=7)) == FRAMES
+
+
+def test_read_frames_gzip(tmpdir):
+    """Checking reading frames from multi-member gzip capture."""
+    path = str(tmpdir.join('capture.bin.gz'))
+    for frame in FRAMES:
+        member = gzip.open(path, 'ab')
+        member.write(frame)
+        member.close()
+    frames = capture.read_frames(path, chunk_size=16, queue_size=1)
+    assert list(frames) == FRAMES
+
+
+def test_read_frames_file_object():
+    """Checking reading frames from file object."""
+    output = StringIO.StringIO()
+    member = gzip.GzipFile(fileobj=output, mode='wb')
+    member.write(STREAM)
+    member.close()
+    source = StringIO.StringIO(output.getvalue())
+    assert list(capture.read_frames(source, compression='.gz')) == FRAMES
+
+
+def test_read_frames_corrupted_gzip():
+    """Checking that decompression error is raised in the reader."""
+    source = StringIO.StringIO(
+        '\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\x03' + '\xff' * 16
+    )
+    with pytest.raises(zlib.error):
+        list(capture.read_frames(source, compression='.gz'))
+
+
+def test_read_frames_truncated_gzip():
+    """Checking that truncated gzip member raises error."""
+    output = StringIO.StringIO()
+    member = gzip.GzipFile(fileobj=output, mode='wb')
+    member.write(STREAM * 10)
+    member.close()
+    source = StringIO.StringIO(output.getvalue()[:-20])
+    with pytest.raises(EOFError):
+        list(capture.read_frames(source, compression='.gz'))
+
+
+@pytest.mark.skipif(capture.lzma is None, reason="lzma is not installed")
+def test_read_frames_xz(tmpdir):
+    """Checking reading frames from xz capture with two streams."""
+    path = tmpdir.join('capture.bin.xz')
+    path.write(
+        capture.lzma.compress(STREAM[:40]) + capture.lzma.compress(STREAM[40:]),
+        mode='wb'
+    )
+    assert list(capture.read_frames(str(path), chunk_size=16)) == FRAMES
+
+
+@pytest.mark.skipif(capture.lzma is None, reason="lzma is not installed")
+def test_read_frames_truncated_xz():
+    """Checking that truncated xz stream raises error."""
+    source = StringIO.StringIO(capture.lzma.compress(STREAM)[:-8])
+    with pytest.raises(EOFError):
+        list(capture.read_frames(source, compression='.xz'))
+
+
+def test_iter_messages():
+    """Checking parsing frames and reporting not parsed frames."""
+    broken = FRAMES[0][:-3] + '\x00\x00\x7e'
+    errors = []
+    messages = list(capture.iter_messages(
+        [FRAMES[0], broken, FRAMES[1]],
+        on_error=lambda frame, error: errors.append((frame, type(error))),
+    ))
+    assert [msg.control.command_response for msg in messages] == ['I', 'RR']
+    assert errors == [(broken, parser.CheckSummError)]
+
+
+def test_iter_messages_raise():
+    """Checking that error is raised without on_error."""
+    with pytest.raises(parser.CheckSummError):
+        list(capture.iter_messages([FRAMES[0][:-3] + '\x00\x00\x7e']))
@@ -0,0 +1,53 @@
+"""Tests combining checksums."""
+import multiprocessing
+import random
+import pytest
+from pars_hdlc import check_summ
+
+FRAME = "7ea011610330d3bee6e700c70181010052ab7e".decode('hex')
+
+
+def random_bytes(generator, size):
+    """Return random bytes"""
+    return ''.join(chr(generator.randrange(256)) for _ in range(size))
+
+
+def test_combine():
+    """Checking that combined checksum equal checksum of concatenation."""
+    generator = random.Random(1)
+    for size in range(0, 300, 7):
+        first = random_bytes(generator, generator.randrange(50))
+        second = random_bytes(generator, size)
+        assert check_summ.combine(
+            check_summ.checksum(first), check_summ.checksum(second),
+            len(second)
+        ) == check_summ.checksum(first + second)
+
+
+def test_combine_fcs():
+    """Checking FCS of the frame extended over the field "information"."""
+    header = FRAME[1:9]
+    information = FRAME[9:-3]
+    assert check_summ.combine(
+        check_summ.checksum(header), check_summ.checksum(information),
+        len(information)
+    ) == 0xab52
+
+
+def test_combine_negative():
+    """Checking the negative length."""
+    with pytest.raises(ValueError):
+        check_summ.combine(0, 0, -1)
+
+
+def test_checksum_chunks():
+    """Checking checksum of chunks computed in worker processes."""
+    data = random_bytes(random.Random(2), 10000)
+    pool = multiprocessing.Pool(2)
+    try:
+        assert check_summ.checksum_chunks(data, 999, pool.map) == \
+            check_summ.checksum(data)
+    finally:
+        pool.close()
+        pool.join()
+    assert check_summ.checksum_chunks('') == check_summ.checksum('')
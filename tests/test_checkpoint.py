@@ -0,0 +1,127 @@
+"""Tests checkpointed processing of captures."""
+import gzip
+import json
+import StringIO
+import pytest
+from pars_hdlc import address
+from pars_hdlc import checkpoint
+from pars_hdlc import serializers
+from pars_hdlc import simulator
+from pars_hdlc import stats
+
+SERVER = address.encode_address(1, 17)
+CLIENT = address.encode_address(0x10)
+
+
+class Interrupted(Exception):
+    """Raised by the writer to simulate the crash"""
+    pass
+
+
+def failing_writer(limit):
+    """Return writer class, which fails after limit messages"""
+    class FailingWriter(serializers.JsonLinesWriter):
+        """Writer, which fails after limit messages"""
+        written = 0
+
+        def write(self, message):
+            """Write one message or fail"""
+            if FailingWriter.written == limit:
+                raise Interrupted()
+            FailingWriter.written += 1
+            super(FailingWriter, self).write(message)
+    return FailingWriter
+
+
+def capture_data():
+    """Return capture with good frames, bad CRC and noise between frames"""
+    frames = []
+    for number in range(60):
+        information = chr(number) * (number % 17 + 3)
+        frame = simulator.build_frame(
+            SERVER, CLIENT, simulator.i_control(number, number), information
+        )
+        if number % 13 == 5:
+            frame = frame[:-3] + '\x00\x00\x7e'
+        frames.append(frame)
+        if number % 7 == 0:
+            frames.append('\x01\x02')
+    return ''.join(frames)
+
+
+def run_job(tmpdir, source, writer_class=serializers.JsonLinesWriter):
+    """Run the job with checkpoint after every chunk"""
+    job = checkpoint.CheckpointedJob(
+        [source], str(tmpdir.join('state.json')), stats.TrafficStats(),
+        output=str(tmpdir.join('out.jsonl')), writer_class=writer_class,
+        interval=0, chunk_size=50,
+    )
+    return job, job.run()
+
+
+@pytest.mark.parametrize("name,compress", [
+    ('capture.bin', False),
+    ('capture.bin.gz', True),
+])
+def test_resume(tmpdir, name, compress):
+    """Checking that the resumed job gives the same result as one run."""
+    data = capture_data()
+    source = tmpdir.join(name)
+    if compress:
+        with gzip.open(str(source), 'wb') as fileobj:
+            fileobj.write(data)
+    else:
+        source.write(data, mode='wb')
+    expected_dir = tmpdir.mkdir('expected')
+    _, expected = run_job(expected_dir, str(source))
+    expected_output = expected_dir.join('out.jsonl').read()
+
+    resumed_dir = tmpdir.mkdir('resumed')
+    for limit in (7, 23):
+        with pytest.raises(Interrupted):
+            run_job(resumed_dir, str(source), failing_writer(limit))
+    job, counters = run_job(resumed_dir, str(source))
+    assert job.checkpoints > 0
+    assert resumed_dir.join('out.jsonl').read() == expected_output
+    assert counters.state() == expected.state()
+    assert counters.frames == 55 and counters.crc_errors == 5
+
+    job, counters = run_job(resumed_dir, str(source))
+    assert job.checkpoints == 0
+    assert counters.state() == expected.state()
+
+
+def test_other_sources(tmpdir):
+    """Checking that the checkpoint of other captures is not used."""
+    source = tmpdir.join('capture.bin')
+    source.write(capture_data(), mode='wb')
+    run_job(tmpdir, str(source))
+    with pytest.raises(ValueError):
+        checkpoint.CheckpointedJob(
+            [str(source), str(source)], str(tmpdir.join('state.json')),
+            stats.TrafficStats(),
+        ).run()
+
+
+def test_save_load(tmpdir):
+    """Checking atomic save and version check."""
+    path = str(tmpdir.join('state.json'))
+    assert checkpoint.load(path) is None
+    checkpoint.save(path, {'version': checkpoint.VERSION, 'index': 3})
+    assert checkpoint.load(path)['index'] == 3
+    assert tmpdir.listdir() == [tmpdir.join('state.json')]
+    with open(path, 'w') as fileobj:
+        json.dump({'version': 0}, fileobj)
+    with pytest.raises(ValueError):
+        checkpoint.load(path)
+
+
+def test_main_checkpoint(tmpdir):
+    """Checking the command line tool with the checkpoint."""
+    source = tmpdir.join('capture.bin')
+    source.write(capture_data(), mode='wb')
+    state = str(tmpdir.join('state.json'))
+    for _ in range(2):
+        out = StringIO.StringIO()
+        assert stats.main([str(source), '--checkpoint', state], out=out) == 0
+        assert 'Frames: 55\n' in out.getvalue()
@@ -0,0 +1,64 @@
+"""Tests detecting duplicated HDLC frames."""
+from pars_hdlc import dedup
+from pars_hdlc import parser
+
+I_FRAME = "7ea011610330d3bee6e700c70181010052ab7e"
+SNRM_FRAME = (
+    "7ea0200361931b9f8180140502080006020800070400000007080400000007b3c67e"
+)
+RR_FRAME = "7ea00703413142e27e"
+
+
+def parse(data):
+    """Return parsed message."""
+    return parser.Parser().get_payload(data)
+
+
+def test_filter():
+    """Checking that repeated frames are dropped."""
+    messages = [parse(frame) for frame in [
+        I_FRAME, SNRM_FRAME, I_FRAME, RR_FRAME, RR_FRAME, SNRM_FRAME
+    ]]
+    deduplicator = dedup.Deduplicator()
+    result = list(deduplicator.filter(messages))
+    assert result == [messages[0], messages[1], messages[3], messages[4]]
+    assert deduplicator.duplicates == 2
+
+
+def test_filter_flag():
+    """Checking that repeated frames are flagged."""
+    messages = [parse(I_FRAME), parse(I_FRAME)]
+    result = list(dedup.Deduplicator().filter(messages, drop=False))
+    assert [duplicate for _, duplicate in result] == [False, True]
+
+
+def test_count_window():
+    """Checking that the window is bounded by count."""
+    deduplicator = dedup.Deduplicator(window=1)
+    i_frame = parse(I_FRAME)
+    snrm_frame = parse(SNRM_FRAME)
+    assert not deduplicator.is_duplicate(i_frame)
+    assert not deduplicator.is_duplicate(snrm_frame)
+    assert not deduplicator.is_duplicate(i_frame)
+    assert len(deduplicator) == 1
+
+
+def test_time_window():
+    """Checking that the window is bounded by time."""
+    deduplicator = dedup.Deduplicator(max_age=5.0)
+    i_frame = parse(I_FRAME)
+    assert not deduplicator.is_duplicate(i_frame, now=1.0)
+    assert deduplicator.is_duplicate(i_frame, now=4.0)
+    assert not deduplicator.is_duplicate(i_frame, now=20.0)
+    assert len(deduplicator) == 1
+
+
+def test_default_time_window():
+    """Checking that the repeated poll is not dropped after max_age."""
+    deduplicator = dedup.Deduplicator()
+    i_frame = parse(I_FRAME)
+    assert not deduplicator.is_duplicate(i_frame, now=100.0)
+    assert deduplicator.is_duplicate(i_frame, now=100.5)
+    assert not deduplicator.is_duplicate(
+        i_frame, now=101.0 + dedup.MAX_AGE
+    )
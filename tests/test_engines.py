@@ -0,0 +1,102 @@
+"""Tests registry of parser engines."""
+import json
+import pytest
+from pars_hdlc import check_summ
+from pars_hdlc import engines
+
+
+def broken_checksum(octets):
+    """Return wrong checksum of the long data"""
+    value = check_summ.checksum(octets)
+    return value ^ 1 if len(octets) > 100 else value
+
+
+# pylint: disable=redefined-outer-name
+@pytest.fixture()
+def cache_path(tmpdir, monkeypatch):
+    """Create fixture, which isolate the engine cache and variables."""
+    monkeypatch.delenv(engines.ENGINE_VARIABLE, raising=False)
+    monkeypatch.delenv(engines.CACHE_VARIABLE, raising=False)
+    return str(tmpdir.join('cache', 'engine.json'))
+
+
+@pytest.fixture()
+def broken(monkeypatch):
+    """Create fixture, which register engine with wrong checksum."""
+    monkeypatch.setattr(engines, '_ENGINES', engines._ENGINES.copy())
+    return engines.register('broken', broken_checksum)
+
+
+def test_checksum_words():
+    """Checking that two octets per step give the reference checksum."""
+    data = '\x7e\xa0\x11\x61\x03\x30\xd3\xbe\xe6\xe7\x00\xc7\x01\x81\x01'
+    for end in range(len(data)):
+        assert check_summ.checksum_words(data[:end]) == \
+            check_summ.checksum(data[:end])
+    assert check_summ.checksum_words(buffer(data, 1)) == \
+        check_summ.checksum(data[1:])
+
+
+def test_self_check(broken):
+    """Checking that the engine with wrong checksum is found."""
+    assert engines.self_check(engines.get('words'))
+    assert not engines.self_check(broken)
+
+
+def test_select_and_cache(cache_path, broken):
+    """Checking that the correct engine is chosen and cached."""
+    engine = engines.select_engine(cache_path)
+    assert engine.name != broken.name
+    with open(cache_path) as cache:
+        data = json.load(cache)
+    assert data['engine'] == engine.name
+    assert broken.name not in data['timings']
+    with open(cache_path, 'w') as cache:
+        json.dump({'engine': engines.REFERENCE}, cache)
+    assert engines.select_engine(cache_path).name == engines.REFERENCE
+    engine = engines.select_engine(cache_path, refresh=True)
+    with open(cache_path) as cache:
+        data = json.load(cache)
+    assert data['engine'] == engine.name
+    assert sorted(data['timings']) == ['python', 'words']
+
+
+def test_cached_engine_checked(cache_path, broken):
+    """Checking that the cached engine, which fails self-check, is not used."""
+    engines.os.makedirs(engines.os.path.dirname(cache_path))
+    with open(cache_path, 'w') as cache:
+        json.dump({'engine': broken.name}, cache)
+    assert engines.select_engine(cache_path) != broken
+    with open(cache_path) as cache:
+        assert json.load(cache)['engine'] != broken.name
+
+
+def test_broken_cache(cache_path):
+    """Checking that unreadable cache is replaced."""
+    engines.os.makedirs(engines.os.path.dirname(cache_path))
+    with open(cache_path, 'w') as cache:
+        cache.write('not json')
+    engine = engines.select_engine(cache_path)
+    assert engine.name in ('python', 'words')
+    with open(cache_path) as cache:
+        assert json.load(cache)['engine'] == engine.name
+
+
+def test_forced(cache_path, monkeypatch):
+    """Checking forcing the engine by environment variable."""
+    monkeypatch.setenv(engines.ENGINE_VARIABLE, 'python')
+    assert engines.select_engine(cache_path).name == 'python'
+    assert not engines.os.path.exists(cache_path)
+    monkeypatch.setenv(engines.ENGINE_VARIABLE, 'missing')
+    with pytest.raises(engines.EngineError):
+        engines.select_engine(cache_path)
+
+
+def test_create_parser(cache_path, monkeypatch):
+    """Checking that the parser of the selected engine parses frames."""
+    monkeypatch.setenv(engines.CACHE_VARIABLE, cache_path)
+    monkeypatch.setattr(engines, '_SELECTED', [])
+    pars = engines.create_parser()
+    assert pars.checksum is engines.get_engine().checksum
+    message = pars.get_payload(engines.CALIBRATION_FRAMES[0])
+    assert message.control.command_response == 'I'
@@ -560,3 +560,52 @@ def test_raise_validate_checksum(pars, test_input):
     fcs, value, checksum_type = test_input
     with pytest.raises(parser.CheckSummError):
         pars._validate_checksum(fcs, value, checksum_type)
+
+
+BAD_FCS = "7ea011610330d3bee6e700c70181010000007e"
+BAD_HCS = "7ea011610330d3bfe6e700c70181010052ab7e"
+
+
+def test_verify_hcs():
+    """Checking that only HCS is checked, FCS is deferred."""
+    pars = parser.Parser(verify=parser.VERIFY_HCS)
+    message = pars.get_payload(BAD_FCS)
+    assert message.fcs == 0
+    with pytest.raises(parser.CheckSummError):
+        pars.get_payload(BAD_HCS)
+    failed = pars.verify_deferred()
+    assert [str(error).split()[0] for _, error in failed] == ['FCS']
+    assert failed[0][0] == BAD_FCS.decode('hex')
+    assert not pars.deferred
+
+
+def test_verify_sampled():
+    """Checking that not sampled checks are deferred and verified later."""
+    pars = parser.Parser(verify=parser.VERIFY_SAMPLED, sample_rate=0.0,
+                         max_deferred=3)
+    pars.get_payload(BAD_HCS)
+    pars.get_payload_bytes(buffer(BAD_FCS.decode('hex')))
+    assert len(pars.deferred) == 3 and pars.deferred_dropped == 1
+    # FCS of the frame with wrong HCS, HCS and FCS of the other frame
+    assert len(pars.verify_deferred(limit=1)) == 1
+    assert len(pars.deferred) == 2
+    assert len(pars.verify_deferred()) == 1
+    pars.sample_rate = 1.0
+    with pytest.raises(parser.CheckSummError):
+        pars.get_payload(BAD_FCS)
+
+
+def test_verify_policy_changed():
+    """Checking that both checks are done after switching to always."""
+    pars = parser.Parser(verify=parser.VERIFY_SAMPLED, sample_rate=0.0)
+    pars.get_payload(BAD_HCS)
+    pars.verify = parser.VERIFY_ALWAYS
+    with pytest.raises(parser.CheckSummError):
+        pars.get_payload(BAD_HCS)
+    assert len(pars.deferred) == 2
+
+
+def test_verify_unknown():
+    """Checking the unknown verification policy."""
+    with pytest.raises(ValueError):
+        parser.Parser(verify='never')
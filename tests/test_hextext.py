@@ -0,0 +1,53 @@
+"""Tests reading text captures with frames in hex."""
+import StringIO
+import pytest
+from pars_hdlc import hextext
+from pars_hdlc import parser
+
+FRAMES = [
+    "7ea011610330d3bee6e700c70181010052ab7e",
+    "7ea00703413142e27e",
+    "7ea0200361931b9f8180140502080006020800070400000007080400000007b3c67e",
+]
+
+
+def test_read_blocks():
+    """Checking offsets and line numbers of the frames in blocks."""
+    text = '\n'.join(FRAMES + ['', FRAMES[1].upper() + '\r']) + '\n'
+    blocks = list(hextext.read_blocks(StringIO.StringIO(text), 3))
+    assert [len(block) for block in blocks] == [3, 1]
+    assert list(blocks[0].offsets) == [0, 19, 28, 62]
+    assert list(blocks[1].line_numbers) == [5]
+    assert str(blocks[0].frame(1)) == FRAMES[1].decode('hex')
+    assert [str(frame).encode('hex') for frame in blocks[0].frames()] == \
+        FRAMES
+
+
+def test_malformed_lines():
+    """Checking that malformed lines are reported and the block is used."""
+    lines = [FRAMES[0], '7ea0070', 'not hex', FRAMES[2], '7ea0', '07']
+    malformed = []
+    blocks = list(hextext.read_blocks(
+        StringIO.StringIO('\n'.join(lines)),
+        on_malformed=lambda number, line: malformed.append((number, line)),
+    ))
+    assert malformed == [(2, '7ea0070'), (3, 'not hex')]
+    assert list(blocks[0].line_numbers) == [1, 4, 5, 6]
+    assert str(blocks[0].frame(2)) == '\x7e\xa0'
+    with pytest.raises(hextext.MalformedLineError) as error:
+        list(hextext.read_blocks(StringIO.StringIO('\n'.join(lines))))
+    assert error.value.line_number == 2
+
+
+def test_iter_messages(tmpdir):
+    """Checking that the frames of the file are parsed."""
+    path = tmpdir.join('capture.txt')
+    path.write('\n'.join(FRAMES * 3 + ['7ea0']) + '\n')
+    errors = []
+    messages = list(hextext.iter_messages(
+        str(path), on_error=lambda frame, error: errors.append(frame),
+        block_lines=4,
+    ))
+    pars = parser.Parser()
+    assert messages == [pars.get_payload(frame) for frame in FRAMES * 3]
+    assert [str(frame) for frame in errors] == ['\x7e\xa0']
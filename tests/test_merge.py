@@ -0,0 +1,84 @@
+"""Tests merging timestamped captures."""
+import StringIO
+import pytest
+from pars_hdlc import hextext
+from pars_hdlc import merge
+
+FRAMES = [
+    "7ea011610330d3bee6e700c70181010052ab7e",
+    "7ea00703413142e27e",
+    "7ea0200361931b9f8180140502080006020800070400000007080400000007b3c67e",
+]
+
+
+def text_capture(records):
+    """Return text capture of (timestamp, frame index)"""
+    return StringIO.StringIO(''.join(
+        '{} {}\n'.format(timestamp, FRAMES[frame])
+        for timestamp, frame in records
+    ))
+
+
+def test_read_records():
+    """Checking reading records and malformed lines."""
+    fileobj = StringIO.StringIO(
+        '1.5 {}\n\nbad\n2 7ea0x\n3 {}\n'.format(FRAMES[0], FRAMES[1])
+    )
+    malformed = []
+    records = list(merge.read_records(
+        fileobj, lambda number, line: malformed.append(number)
+    ))
+    assert records == [(1.5, FRAMES[0].decode('hex')),
+                       (3.0, FRAMES[1].decode('hex'))]
+    assert malformed == [3, 4]
+    with pytest.raises(hextext.MalformedLineError):
+        list(merge.read_records(StringIO.StringIO('bad\n')))
+
+
+def test_merge(tmpdir):
+    """Checking the order of the merged sources."""
+    path = tmpdir.join('gateway.txt')
+    path.write(text_capture([(1, 0), (4, 1), (6, 2)]).getvalue())
+    sources = [
+        str(path),
+        merge.read_records(text_capture([(2, 1), (4, 2)])),
+        [],
+        [(0.5, FRAMES[2].decode('hex')), (7, FRAMES[0].decode('hex'))],
+    ]
+    merged = list(merge.merge(sources, read_ahead=1))
+    assert [(timestamp, index) for timestamp, index, _ in merged] == [
+        (0.5, 3), (1, 0), (2, 1), (4, 0), (4, 1), (6, 0), (7, 3)
+    ]
+
+
+def test_read_ahead_bounded():
+    """Checking that not more than read_ahead records are read ahead."""
+    read = [0, 0]
+
+    def source(number):
+        """Generator of records, which counts read records"""
+        for timestamp in range(number, 100, 2):
+            read[number] += 1
+            yield timestamp, FRAMES[1].decode('hex')
+
+    merged = merge.merge([source(0), source(1)], read_ahead=4)
+    for count in range(1, 60):
+        next(merged)
+        assert sum(read) - count <= 2 * 4
+
+
+def test_iter_messages():
+    """Checking parsing of the merged frames."""
+    errors = []
+    sources = [
+        merge.read_records(text_capture([(1, 0), (3, 2)])),
+        [(2, '\x7e\xa0')],
+    ]
+    messages = list(merge.iter_messages(
+        sources, on_error=lambda frame, error: errors.append(frame)
+    ))
+    assert [(timestamp, index) for timestamp, index, _ in messages] == [
+        (1, 0), (3, 0)
+    ]
+    assert messages[1][2].control.command_response == 'SNRM'
+    assert errors == ['\x7e\xa0']
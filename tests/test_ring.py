@@ -0,0 +1,115 @@
+"""Tests shared memory ring buffer."""
+import multiprocessing
+import Queue
+import pytest
+from pars_hdlc import parser
+from pars_hdlc import ring
+
+FRAMES = [
+    "7ea011610330d3bee6e700c70181010052ab7e".decode('hex'),
+    "7ea00703413142e27e".decode('hex'),
+    "7ea0200361931b9f818014050208000602080007040000000708040000"
+    "0007b3c67e".decode('hex'),
+]
+
+
+def produce(buffer_ring, count):
+    """Write frames into the ring and close it."""
+    for number in range(count):
+        buffer_ring.put(FRAMES[number % len(FRAMES)])
+    buffer_ring.close()
+
+
+def test_put_get():
+    """Checking writing and reading frames with wrapping the ring."""
+    buffer_ring = ring.RingBuffer(size=128)
+    for number in range(20):
+        frame = FRAMES[number % len(FRAMES)]
+        buffer_ring.put(frame)
+        view = buffer_ring.view()
+        assert view[:] == frame
+        buffer_ring.release()
+    assert len(buffer_ring) == 0
+
+
+def test_backpressure():
+    """Checking that the full ring raises Queue.Full."""
+    buffer_ring = ring.RingBuffer(size=46)
+    buffer_ring.put(FRAMES[0])
+    buffer_ring.put(FRAMES[0])
+    with pytest.raises(Queue.Full):
+        buffer_ring.put(FRAMES[0], block=False)
+    with pytest.raises(Queue.Full):
+        buffer_ring.put(FRAMES[0], timeout=0.01)
+    assert buffer_ring.get() == FRAMES[0]
+    buffer_ring.put(FRAMES[0], block=False)
+    assert len(buffer_ring) == 46
+
+
+def test_empty_and_closed():
+    """Checking reading the empty and the closed ring."""
+    buffer_ring = ring.RingBuffer(size=64)
+    with pytest.raises(Queue.Empty):
+        buffer_ring.get(block=False)
+    buffer_ring.put(FRAMES[1])
+    buffer_ring.close()
+    assert buffer_ring.get() == FRAMES[1]
+    with pytest.raises(EOFError):
+        buffer_ring.get()
+
+
+def test_too_big_frame():
+    """Checking that the frame bigger than half of the ring is rejected."""
+    with pytest.raises(ValueError):
+        ring.RingBuffer(size=45).put(FRAMES[0])
+
+
+def test_wrap_not_fitting_frame():
+    """Checking the frame, which does not fit at the end of the ring."""
+    buffer_ring = ring.RingBuffer(size=76)
+    for _ in range(2):
+        buffer_ring.put(FRAMES[2][:30])
+        assert buffer_ring.get() == FRAMES[2][:30]
+    buffer_ring.put(FRAMES[2], timeout=1.0)
+    assert buffer_ring.get() == FRAMES[2]
+
+
+def test_iter_messages_errors():
+    """Checking that not parsed frames are reported with their copy."""
+    buffer_ring = ring.RingBuffer(size=256)
+    broken = FRAMES[0][:-3] + '\x00\x00\x7e'
+    for frame in (FRAMES[0], broken, FRAMES[1]):
+        buffer_ring.put(frame)
+    buffer_ring.close()
+    errors = []
+    pars = parser.Parser()
+    messages = list(ring.iter_messages(
+        buffer_ring, pars, lambda frame, error: errors.append(frame)
+    ))
+    assert [msg.control.command_response for msg in messages] == ['I', 'RR']
+    assert errors == [broken]
+    assert pars.get_apdu() is None
+    assert len(buffer_ring) == 0
+
+
+def test_processes():
+    """Checking passing frames from the other process."""
+    buffer_ring = ring.RingBuffer(size=256)
+    process = multiprocessing.Process(target=produce, args=(buffer_ring, 300))
+    process.start()
+    messages = list(ring.iter_messages(buffer_ring))
+    process.join()
+    assert len(messages) == 300
+    assert messages[2].control.command_response == 'SNRM'
+
+
+def test_file(tmpdir):
+    """Checking the ring in the file opened twice."""
+    path = str(tmpdir.join('ring'))
+    producer = ring.RingBuffer(size=128, path=path)
+    consumer = ring.RingBuffer(path=path, create=False)
+    producer.put(FRAMES[2])
+    assert consumer.capacity == 128
+    assert consumer.get() == FRAMES[2]
+    producer.release_memory()
+    consumer.release_memory()
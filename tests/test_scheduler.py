@@ -0,0 +1,90 @@
+"""Tests scheduling control frames before I-frames."""
+import Queue
+import pytest
+from pars_hdlc import address
+from pars_hdlc import capture
+from pars_hdlc import scheduler
+from pars_hdlc import simulator
+
+SERVER = address.encode_address(1, 17)
+CLIENT = address.encode_address(0x10)
+
+
+OTHER_SERVER = address.encode_address(1, 18)
+
+
+def frame(control, information='', server=SERVER):
+    """Return frame from the client to the server"""
+    return simulator.build_frame(server, CLIENT, control, information)
+
+
+@pytest.mark.parametrize("control,expected", [
+    (simulator.CONTROL_SNRM, 'SNRM'),
+    (simulator.CONTROL_DISC, 'DISC'),
+    (simulator.CONTROL_UA, 'UA'),
+    (simulator.rr_control(3), 'RR'),
+    (simulator.i_control(2, 5), 'I'),
+])
+def test_classify(control, expected):
+    """Checking the type of the command by the field "control"."""
+    assert scheduler.classify(frame(control)) == expected
+    long_address = simulator.build_frame(
+        address.encode_address(300, 1000), CLIENT, control
+    )
+    assert scheduler.classify(long_address) == expected
+
+
+def test_classify_short():
+    """Checking the truncated frame."""
+    assert scheduler.classify(frame(simulator.CONTROL_SNRM)[:5]) == ''
+
+
+def test_priority():
+    """Checking that control frames are served first, I-frames progress."""
+    queue = scheduler.FrameScheduler(bulk_every=2)
+    bulk = [frame(simulator.i_control(n, 0), 'x' * 10) for n in range(3)]
+    control = [
+        frame(simulator.rr_control(n), server=OTHER_SERVER) for n in range(5)
+    ]
+    for item in bulk + control:
+        queue.put(item)
+    served = [queue.get() for _ in range(len(bulk + control))]
+    assert served == (control[:2] + bulk[:1] + control[2:4] + bulk[1:2] +
+                      control[4:] + bulk[2:])
+    with pytest.raises(Queue.Empty):
+        queue.get()
+
+
+def test_schedule():
+    """Checking reordering of the stream and parsing the result."""
+    bulk = [frame(simulator.i_control(n, 0), 'x' * 10) for n in range(6)]
+    disc = frame(simulator.CONTROL_DISC, server=OTHER_SERVER)
+    frames = list(scheduler.schedule(bulk + [disc], window=4))
+    assert sorted(frames) == sorted(bulk + [disc])
+    assert frames.index(disc) == 3
+    assert frames[:3] == bulk[:3]
+    messages = list(capture.iter_messages(frames))
+    assert messages[3].control.command_response == 'DISC'
+
+
+def test_link_order():
+    """Checking that frames of one link are not reordered."""
+    queue = scheduler.FrameScheduler()
+    bulk = [frame(simulator.i_control(n, 0), 'x' * 10) for n in range(2)]
+    disc = frame(simulator.CONTROL_DISC)
+    other = frame(simulator.rr_control(0), server=OTHER_SERVER)
+    for item in bulk + [disc, other]:
+        queue.put(item)
+    served = [queue.get() for _ in range(4)]
+    assert served == [other] + bulk + [disc]
+
+
+def test_link_order_bulk_turn():
+    """Checking that I-frame does not overtake control frame of its link."""
+    queue = scheduler.FrameScheduler(bulk_every=1)
+    other = frame(simulator.rr_control(0), server=OTHER_SERVER)
+    control = frame(simulator.rr_control(1))
+    bulk = frame(simulator.i_control(1, 0), 'x' * 10)
+    for item in [other, control, bulk]:
+        queue.put(item)
+    assert [queue.get() for _ in range(3)] == [other, control, bulk]
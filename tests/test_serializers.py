@@ -0,0 +1,85 @@
+"""Tests writing parsed messages."""
+import csv
+import json
+import StringIO
+import pytest
+from pars_hdlc import parser
+from pars_hdlc import serializers
+
+FRAMES = [
+    "7ea011610330d3bee6e700c70181010052ab7e",
+    "7ea00703413142e27e",
+    "7ea0200361931b9f8180140502080006020800070400000007080400000007b3c67e",
+]
+
+
+# pylint: disable=redefined-outer-name
+@pytest.fixture()
+def messages():
+    """Create fixture, which parse the frames."""
+    return [parser.Parser().get_payload(frame) for frame in FRAMES]
+
+
+def test_json_lines(messages):
+    """Checking writing messages in JSON Lines."""
+    output = StringIO.StringIO()
+    count = serializers.JsonLinesWriter(output).write_all(messages)
+    lines = output.getvalue().splitlines()
+    assert count == len(lines) == 3
+    first = json.loads(lines[0])
+    assert first['command_response'] == 'I'
+    assert first['information'] == 'e6e700c701810100'
+    assert first['fcs'] == 43858
+    second = json.loads(lines[1])
+    assert second['information'] is None
+    assert second['frame_len'] == 7
+
+
+def test_csv(messages):
+    """Checking writing messages in CSV."""
+    output = StringIO.StringIO()
+    serializers.CsvWriter(output).write_all(messages)
+    output.seek(0)
+    rows = list(csv.DictReader(output))
+    assert [row['command_response'] for row in rows] == ['I', 'RR', 'SNRM']
+    assert rows[1]['fcs'] == ''
+    assert rows[2]['dest_addr'] == '03'
+
+
+def test_binary(messages):
+    """Checking that binary records are read back to the same messages."""
+    output = StringIO.StringIO()
+    serializers.BinaryWriter(output).write_all(messages)
+    output.seek(0)
+    assert list(serializers.read_binary(output)) == messages
+
+
+def test_binary_format_type(messages):
+    """Checking binary record of the frame with other format type."""
+    message = messages[0]._replace(
+        frame_format=messages[0].frame_format._replace(format_type=32768)
+    )
+    output = StringIO.StringIO()
+    serializers.BinaryWriter(output).write(message)
+    output.seek(0)
+    assert list(serializers.read_binary(output)) == [message]
+
+
+def test_binary_format_type_zero(messages):
+    """Checking binary record of the frame with format type 0."""
+    message = messages[1]._replace(
+        frame_format=messages[1].frame_format._replace(format_type=0)
+    )
+    output = StringIO.StringIO()
+    serializers.BinaryWriter(output).write(message)
+    output.seek(0)
+    assert list(serializers.read_binary(output)) == [message]
+
+
+def test_binary_truncated(messages):
+    """Checking that the truncated record raises error."""
+    output = StringIO.StringIO()
+    serializers.BinaryWriter(output).write(messages[0])
+    output = StringIO.StringIO(output.getvalue()[:5])
+    with pytest.raises(ValueError):
+        list(serializers.read_binary(output))
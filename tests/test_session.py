@@ -0,0 +1,108 @@
+"""Tests tracking sequence numbers of HDLC links."""
+import pytest
+from pars_hdlc import parser
+from pars_hdlc import session
+
+
+def make_message(command, send=0, recive=0, dest_addr='61', scr_addr='03'):
+    """Create instance 'Message' with the given field "control"."""
+    return parser.Message(
+        flag='7e',
+        frame_format=parser.FrameFormat(
+            frame_len=17, fragmention_bit='False', format_type=3
+        ),
+        dest_addr=dest_addr,
+        scr_addr=scr_addr,
+        control=parser.Control(
+            lsb=0 if command == 'I' else 1,
+            command_response=command,
+            recive=recive << 5,
+            send=send << 1,
+            poll_finall=1,
+        ),
+        hcs=0,
+        information=None,
+        fcs=None,
+        flag_end='7e',
+    )
+
+
+# pylint: disable=redefined-outer-name
+@pytest.fixture()
+def tracker():
+    """Create fixture, which create new instance SessionTracker."""
+    return session.SessionTracker(capacity=4, idle_timeout=10.0)
+
+
+def test_sequence(tracker):
+    """Checking events for ordered, lost and duplicated I-frames."""
+    events = [
+        tracker.update(make_message('SNRM'), now=1.0),
+        tracker.update(make_message('I', send=0), now=2.0),
+        tracker.update(make_message('I', send=1), now=3.0),
+        tracker.update(make_message('I', send=1), now=4.0),
+        tracker.update(make_message('I', send=4), now=5.0),
+        tracker.update(make_message('RR', recive=3), now=6.0),
+        tracker.update(make_message('I', send=5, recive=2), now=7.0),
+    ]
+    assert events == [
+        session.LINK_RESET,
+        session.SEQUENCE_OK,
+        session.SEQUENCE_OK,
+        session.SEQUENCE_DUPLICATE,
+        session.SEQUENCE_LOST,
+        session.SEQUENCE_OK,
+        session.SEQUENCE_OK,
+    ]
+    assert tracker.lost == 2
+    assert tracker.duplicates == 1
+    assert tracker.get_state(('61', '03')) == (6, 2, 7.0)
+
+
+def test_old_retransmission(tracker):
+    """Checking that retransmission older than the last frame is duplicate."""
+    for send in range(3):
+        tracker.update(make_message('I', send=send), now=1.0)
+    assert tracker.update(make_message('I', send=1), now=2.0) == \
+        session.SEQUENCE_DUPLICATE
+    assert tracker.lost == 0
+    assert tracker.get_state(('61', '03'))[0] == 3
+    assert tracker.update(make_message('I', send=3), now=3.0) == \
+        session.SEQUENCE_OK
+
+
+def test_sequence_wraps(tracker):
+    """Checking that N(S) wraps modulo 8."""
+    tracker.update(make_message('I', send=7), now=1.0)
+    assert tracker.update(make_message('I', send=0), now=2.0) == \
+        session.SEQUENCE_OK
+
+
+def test_reset(tracker):
+    """Checking that SNRM/DISC/UA reset the link."""
+    tracker.update(make_message('I', send=3), now=1.0)
+    assert tracker.update(make_message('DISC'), now=2.0) == session.LINK_RESET
+    assert tracker.update(make_message('I', send=0), now=3.0) == \
+        session.SEQUENCE_OK
+
+
+def test_evict_idle(tracker):
+    """Checking that idle links are removed."""
+    tracker.update(make_message('I', dest_addr='10'), now=1.0)
+    tracker.update(make_message('I', dest_addr='11'), now=8.0)
+    tracker.update(make_message('I', dest_addr='12'), now=12.0)
+    assert ('10', '03') not in tracker
+    assert tracker.evict_idle(now=30.0) == 2
+    assert len(tracker) == 0
+
+
+def test_evict_least_recently_used(tracker):
+    """Checking that the least recently used link is replaced, when full."""
+    for number, addr in enumerate(['10', '11', '12', '13']):
+        tracker.update(make_message('I', dest_addr=addr), now=number)
+    tracker.update(make_message('I', dest_addr='10'), now=5.0)
+    tracker.update(make_message('I', dest_addr='14'), now=6.0)
+    assert len(tracker) == 4
+    assert ('11', '03') not in tracker
+    assert ('10', '03') in tracker
+    assert tracker.evicted == 1
@@ -0,0 +1,73 @@
+"""Tests fleet of virtual meters and load test harness."""
+import StringIO
+import pytest
+from pars_hdlc import parser
+from pars_hdlc import simulator
+
+
+@pytest.mark.parametrize("test_input,expected", [
+    (
+        ('\x03', '\x61', 0x93,
+         "8180140502080006020800070400000007080400000007".decode('hex')),
+        "7ea0200361931b9f8180140502080006020800070400000007080400000007b3c67e",
+    ),
+    (
+        ('\x03', '\x41', 0x31, ''),
+        "7ea00703413142e27e",
+    ),
+])
+def test_build_frame(test_input, expected):
+    """Checking that built frames are the same as the real ones."""
+    assert simulator.build_frame(*test_input).encode('hex') == expected
+
+
+def test_build_segmented_frame():
+    """Checking the segmentation bit of the built frame."""
+    frame = simulator.build_frame('\x03', '\x61', 0x10, 'data', True)
+    message = parser.Parser().get_payload_bytes(frame)
+    assert message.frame_format.fragmention_bit == 'True'
+    assert message.information == 'data'.encode('hex')
+
+
+def test_percentile():
+    """Checking nearest rank percentile."""
+    values = range(1, 1001)
+    assert simulator.percentile(values, 0.5) == 500
+    assert simulator.percentile(values, 0.999) == 999
+    assert simulator.percentile([], 0.5) is None
+
+
+def test_load():
+    """Checking the load test with segmented responses."""
+    with simulator.MeterFleet(response_size=300, segments=3) as fleet:
+        result = simulator.LoadHarness(fleet.address, links=20, polls=5).run()
+    assert result.polls == 100
+    assert result.frames == 20 + 100 * 3
+    assert result.errors == 0
+    assert 0 < result.p50 <= result.p99 <= result.p999
+
+
+def test_load_errors():
+    """Checking that the polls are completed, when frames are corrupted."""
+    with simulator.MeterFleet(segments=2, error_ratio=0.2, seed=1) as fleet:
+        result = simulator.LoadHarness(fleet.address, links=10, polls=10).run()
+    assert result.polls == 100
+    assert result.errors > 0
+
+
+def test_load_delay():
+    """Checking that delayed responses of the meters do not add up."""
+    with simulator.MeterFleet(response_delay=0.05) as fleet:
+        result = simulator.LoadHarness(fleet.address, links=20, polls=2).run()
+    assert result.polls == 40
+    assert result.p50 >= 0.05
+    # one poll round of all links, when the delays run concurrently
+    assert result.elapsed < 20 * 0.05
+
+
+def test_main():
+    """Checking the command line tool."""
+    out = StringIO.StringIO()
+    assert simulator.main(['--meters', '5', '--polls', '2'], out=out) == 0
+    assert 'Polls: 10\n' in out.getvalue()
+    assert 'Latency p50/p99/p999' in out.getvalue()
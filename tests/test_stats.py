@@ -0,0 +1,46 @@
+"""Tests traffic statistics."""
+import StringIO
+from pars_hdlc import stats
+
+FRAMES = [
+    "7ea011610330d3bee6e700c70181010052ab7e".decode('hex'),
+    "7ea00703413142e27e".decode('hex'),
+    "7ea00703413142e27e".decode('hex'),
+    "7ea011610330d3bee6e700c70181010000007e".decode('hex'),
+]
+
+
+def test_space_saving():
+    """Checking that heavy hitters are found with bounded counters."""
+    sketch = stats.SpaceSaving(2)
+    for key in ['a', 'b', 'a', 'c', 'a', 'd', 'a']:
+        sketch.add(key)
+    assert len(sketch.counts) == 2
+    assert sketch.top(1) == [('a', 4, 0)]
+    assert sketch.top(2)[1][1:] == (3, 2)
+
+
+def test_space_saving_replaces_minimal():
+    """Checking that the new key replaces the minimal counter."""
+    sketch = stats.SpaceSaving(2)
+    for key in ['a', 'a', 'a', 'b', 'c', 'c']:
+        sketch.add(key)
+    assert sorted(sketch.counts.items()) == [('a', 3), ('c', 3)]
+    assert sketch.errors['c'] == 1
+
+
+def test_main(tmpdir):
+    """Checking the statistics printed by the command line tool."""
+    path = tmpdir.join('capture.bin')
+    path.write(''.join(FRAMES), mode='wb')
+    out = StringIO.StringIO()
+    assert stats.main([str(path), '--top', '1'], out=out) == 0
+    report = out.getvalue()
+    assert 'Frames: 3\n' in report
+    assert '\tCRC: 1 (25.0000%)\n' in report
+    assert '\tI: 1\n' in report
+    assert '\tRR: 2\n' in report
+    assert '\t0-7: 2\n' in report
+    assert '\t16-31: 1\n' in report
+    assert '\t03 41: 2 (+-0)\n' in report
+    assert 'frames/s' in report